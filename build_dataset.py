@@ -1,16 +1,59 @@
 #!/usr/bin/env python3
 """
 CyberSen Detector - Constructor de dataset
-Consolida TODOS los *_dataset.csv generados por extract_features.py
+Consolida TODOS los *_dataset.parquet / *_dataset.csv generados por extract_features.py
 """
 import pandas as pd
+import numpy as np
 import glob
 import os
-from sklearn.utils import shuffle
 from collections import Counter
 import warnings
 warnings.filterwarnings('ignore')
 
+# El parser de pyarrow es multihilo; si no está instalado se usa el de C
+# y el dataset final se guarda en CSV en lugar de Parquet
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+    DEFAULT_FORMAT = 'parquet'
+except ImportError:
+    CSV_ENGINE = 'c'
+    DEFAULT_FORMAT = 'csv'
+
+# Columnas obligatorias en cada *_dataset
+REQUIRED_COLS = ['frame_type', 'rssi', 'packet_rate', 'freq', 'label']
+
+# (time, src_mac, frame_type) identifica un paquete de forma única
+DEDUP_KEYS = ['time', 'src_mac', 'frame_type']
+
+# Sin balanceo, la gráfica de distribución solo se muestra hasta este tamaño
+PREVIEW_MAX_ROWS = 1_000_000
+
+# Esquema fijo de los datasets que genera extract_features.py
+# (evita la inferencia de tipos y reduce memoria con enteros estrechos y categóricas)
+# Enteros anulables: los CSV del extractor anterior dejan vacío el RSSI de las
+# tramas RadioTap sin dBm_AntSignal; train_model.py trata esos valores
+DTYPES = {
+    'frame_type': 'Int8',
+    'rssi': 'Int16',
+    'packet_rate': 'Int32',
+    'freq': 'Int16',
+    'retry': 'Int8',
+    'power_mgmt': 'Int8',
+    'src_mac': 'category',
+    'dst_mac': 'category',
+    'label': 'category'
+}
+
+def shuffle(df, random_state=42):
+    """
+    Mezcla las filas del DataFrame con una permutación de índices
+    (un único take en C en lugar del reindexado de sklearn.utils.shuffle)
+    """
+    perm = np.random.default_rng(random_state).permutation(len(df))
+    return df.take(perm, axis=0)
+
 def balance_dataset(df, strategy='undersample', max_ratio=5):
     """
     Balancea el dataset para evitar bias hacia clases mayoritarias
@@ -24,6 +67,7 @@ def balance_dataset(df, strategy='undersample', max_ratio=5):
         DataFrame balanceado
     """
     label_counts = df['label'].value_counts()
+    label_counts = label_counts[label_counts > 0]  # Categorías sin filas
     print(f"\n[*] Distribución original:")
     for label, count in label_counts.items():
         pct = (count / len(df)) * 100
@@ -43,17 +87,13 @@ def balance_dataset(df, strategy='undersample', max_ratio=5):
     if strategy == 'undersample':
         # Submuestreo de la clase mayoritaria
         minority_size = label_counts.min()
-        target_size = min(minority_size * max_ratio, label_counts.max())
-        
-        balanced_dfs = []
-        for label in df['label'].unique():
-            label_df = df[df['label'] == label]
-            if len(label_df) > target_size:
-                label_df = label_df.sample(n=int(target_size), random_state=42)
-            balanced_dfs.append(label_df)
+        target_size = int(min(minority_size * max_ratio, label_counts.max()))
         
-        df_balanced = pd.concat(balanced_dfs, ignore_index=True)
-        df_balanced = shuffle(df_balanced, random_state=42)
+        # Mezclar una vez y quedarse con las primeras target_size filas de cada
+        # clase: equivale a muestrear cada clase sin bucle ni concat por etiqueta
+        df_shuffled = shuffle(df, random_state=42)
+        rank = df_shuffled.groupby('label', observed=True).cumcount()
+        df_balanced = df_shuffled[(rank < target_size).to_numpy()]
         
         print(f"\n[*] Distribución balanceada (undersample):")
         label_counts_balanced = df_balanced['label'].value_counts()
@@ -67,85 +107,157 @@ def balance_dataset(df, strategy='undersample', max_ratio=5):
         # Por ahora solo implementamos undersample
         return df
 
-def build_dataset(input_folder="data/", output_file="data/final_dataset.csv", balance=True):
+def read_columns(path):
+    """Devuelve las columnas de un dataset leyendo solo su cabecera/esquema"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_dataset_file(path, columns):
+    """Lee un dataset (Parquet o CSV) aplicando el esquema fijo (DTYPES)"""
+    dtype = {col: DTYPES[col] for col in columns if col in DTYPES}
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path).astype(dtype)
+    return pd.read_csv(path, dtype=dtype, engine=CSV_ENGINE)
+
+def save_dataset(df, output_file):
+    """Guarda el dataset en Parquet o CSV según la extensión"""
+    if output_file.endswith('.parquet'):
+        df.to_parquet(output_file, index=False, compression='zstd')
+    else:
+        df.to_csv(output_file, index=False)
+
+def iter_datasets(valid_files, loaded):
+    """
+    Lee uno a uno los datasets validados con el esquema fijo (DTYPES)
+    
+    Args:
+        valid_files: Lista de (ruta, columnas) ya validadas
+        loaded: Diccionario donde se acumula el total de filas leídas
+    
+    Yields:
+        DataFrame de cada archivo
+    """
+    for f, columns in valid_files:
+        try:
+            print(f"[*] Cargando: {os.path.basename(f)}")
+            df_temp = read_dataset_file(f, columns)
+        except Exception as e:
+            print(f"[⚠️] Error leyendo {os.path.basename(f)}: {e}")
+            continue
+        
+        print(f"    Registros: {len(df_temp)}")
+        
+        # Mostrar distribución
+        label_counts = df_temp['label'].value_counts()
+        for label, count in label_counts.items():
+            print(f"      {label}: {count}")
+        
+        loaded['rows'] += len(df_temp)
+        yield df_temp
+
+def build_dataset(input_folder="data/", output_file=None, balance=True, output_format=DEFAULT_FORMAT,
+                  shuffle_rows=False):
     """
     Construye dataset final consolidando múltiples capturas
     
     Args:
-        input_folder: Carpeta con archivos CSV
-        output_file: Archivo de salida
+        input_folder: Carpeta con archivos Parquet/CSV
+        output_file: Archivo de salida (por defecto data/final_dataset.<formato>)
         balance: Si se debe balancear el dataset
+        output_format: 'parquet' o 'csv' para el archivo de salida por defecto
+        shuffle_rows: Mezclar las filas antes de guardar (train_test_split
+            ya mezcla al entrenar y el balanceo deja las filas mezcladas)
     """
     os.makedirs(input_folder, exist_ok=True)
     
-    # Buscar todos los CSV generados por extract_features.py
-    # Patrón: *_dataset.csv (ej: trafico_normal_dataset.csv)
-    csv_files = glob.glob(os.path.join(input_folder, "*_dataset.csv"))
+    if output_file is None:
+        output_file = os.path.join("data", f"final_dataset.{output_format}")
+    
+    # Buscar todos los datasets generados por extract_features.py
+    # Patrón: *_dataset.parquet / *_dataset.csv (ej: trafico_normal_dataset.parquet)
+    dataset_files = sorted(
+        glob.glob(os.path.join(input_folder, "*_dataset.parquet")) +
+        glob.glob(os.path.join(input_folder, "*_dataset.csv"))
+    )
+    # Excluir el dataset final de ejecuciones anteriores
+    dataset_files = [f for f in dataset_files if 'final_dataset' not in os.path.basename(f)]
     
-    if not csv_files:
-        print(f"[!] No se encontraron archivos *_dataset.csv en {input_folder}")
+    if not dataset_files:
+        print(f"[!] No se encontraron archivos *_dataset.parquet / *_dataset.csv en {input_folder}")
         print(f"[!] Asegúrate de ejecutar extract_features.py primero")
         print(f"\n[*] Buscando archivos CSV alternativos...")
         
         # Buscar cualquier CSV como fallback
-        csv_files = glob.glob(os.path.join(input_folder, "*.csv"))
-        csv_files = [f for f in csv_files if 'final_dataset' not in f]
+        dataset_files = glob.glob(os.path.join(input_folder, "*.csv"))
+        dataset_files = [f for f in dataset_files if 'final_dataset' not in f]
         
-        if not csv_files:
+        if not dataset_files:
             print(f"[!] No se encontraron archivos CSV en {input_folder}")
             return False
     
     print(f"\n{'='*60}")
-    print(f"[+] Archivos CSV encontrados: {len(csv_files)}")
+    print(f"[+] Archivos de dataset encontrados: {len(dataset_files)}")
     print(f"{'='*60}")
-    for f in csv_files:
+    for f in dataset_files:
         size_kb = os.path.getsize(f) / 1024
         print(f"   - {os.path.basename(f)} ({size_kb:.2f} KB)")
     print(f"{'='*60}\n")
     
-    # Cargar y concatenar todos los CSV
-    dfs = []
-    total_rows_loaded = 0
+    # Validar esquema de cada archivo leyendo solo la cabecera
+    valid_files = []
     
-    for f in csv_files:
+    for f in dataset_files:
         try:
-            print(f"[*] Cargando: {os.path.basename(f)}")
-            df_temp = pd.read_csv(f)
-            
-            # Verificar columnas necesarias
-            required_cols = ['frame_type', 'rssi', 'packet_rate', 'freq', 'label']
-            missing_cols = [col for col in required_cols if col not in df_temp.columns]
-            
-            if missing_cols:
-                print(f"[⚠️] Ignorando {os.path.basename(f)}: faltan columnas {missing_cols}")
-                continue
-            
-            print(f"    Registros: {len(df_temp)}")
-            
-            # Mostrar distribución
-            label_counts = df_temp['label'].value_counts()
-            for label, count in label_counts.items():
-                print(f"      {label}: {count}")
-            
-            dfs.append(df_temp)
-            total_rows_loaded += len(df_temp)
-            
+            columns = read_columns(f)
         except Exception as e:
             print(f"[⚠️] Error leyendo {os.path.basename(f)}: {e}")
             continue
+        
+        # Verificar columnas necesarias
+        missing_cols = [col for col in REQUIRED_COLS if col not in columns]
+        
+        if missing_cols:
+            print(f"[⚠️] Ignorando {os.path.basename(f)}: faltan columnas {missing_cols}")
+            continue
+        
+        valid_files.append((f, columns))
     
-    if not dfs:
+    if not valid_files:
         print(f"[!] No se pudieron cargar datasets válidos")
         return False
     
-    print(f"\n[*] Consolidando {len(dfs)} dataset(s)...")
-    df = pd.concat(dfs, ignore_index=True)
+    # Cargar y concatenar en streaming: el generador entrega los datasets a
+    # pd.concat y ninguna lista retiene los DataFrames originales después
+    print(f"[*] Consolidando {len(valid_files)} dataset(s)...")
+    loaded = {'rows': 0}
+    frames = iter_datasets(valid_files, loaded)
+    
+    # Con un solo archivo no hace falta concat (evita una copia completa)
+    if len(valid_files) == 1:
+        df = next(frames, None)
+    else:
+        try:
+            df = pd.concat(frames, ignore_index=True)
+        except ValueError:
+            # Ningún archivo se pudo leer
+            df = None
     
+    if df is None:
+        print(f"[!] No se pudieron cargar datasets válidos")
+        return False
+    
+    total_rows_loaded = loaded['rows']
     print(f"[*] Total de registros cargados: {total_rows_loaded}")
     
     # Eliminar duplicados
+    # Se hashean solo las columnas clave en lugar de la fila completa
     original_len = len(df)
-    df.drop_duplicates(inplace=True)
+    if all(col in df.columns for col in DEDUP_KEYS):
+        df.drop_duplicates(subset=DEDUP_KEYS, inplace=True)
+    else:
+        df.drop_duplicates(inplace=True)
     removed = original_len - len(df)
     
     if removed > 0:
@@ -154,29 +266,32 @@ def build_dataset(input_folder="data/", output_file="data/final_dataset.csv", ba
     print(f"[*] Registros finales antes del balanceo: {len(df)}")
     
     # Mostrar distribución antes del balanceo
-    print(f"\n{'='*60}")
-    print(f"📊 DISTRIBUCIÓN DE ETIQUETAS (ANTES DEL BALANCEO)")
-    print(f"{'='*60}")
-    label_counts = df['label'].value_counts()
-    total = len(df)
-    
-    for label, count in label_counts.items():
-        pct = (count / total) * 100
-        bar_length = int(pct / 2)  # Barra visual
-        bar = '█' * bar_length
-        print(f"{label:15s} | {bar} {count:6d} ({pct:5.2f}%)")
-    print(f"{'='*60}")
+    # Sin balanceo y con datasets muy grandes se omite (pasada O(N) innecesaria)
+    if balance or len(df) <= PREVIEW_MAX_ROWS:
+        print(f"\n{'='*60}")
+        print(f"📊 DISTRIBUCIÓN DE ETIQUETAS (ANTES DEL BALANCEO)")
+        print(f"{'='*60}")
+        label_counts = df['label'].value_counts()
+        total = len(df)
+        
+        for label, count in label_counts.items():
+            pct = (count / total) * 100
+            bar_length = int(pct / 2)  # Barra visual
+            bar = '█' * bar_length
+            print(f"{label:15s} | {bar} {count:6d} ({pct:5.2f}%)")
+        print(f"{'='*60}")
     
     # Balancear dataset si es necesario
     if balance and len(df['label'].unique()) > 1:
         print(f"\n[*] Aplicando balanceo de clases...")
         df = balance_dataset(df, strategy='undersample', max_ratio=10)
     
-    # Mezclar aleatoriamente
-    df = shuffle(df, random_state=42)
+    # Mezclar aleatoriamente (opcional)
+    if shuffle_rows:
+        df = shuffle(df, random_state=42)
     
     # Guardar dataset combinado
-    df.to_csv(output_file, index=False)
+    save_dataset(df, output_file)
     
     print(f"\n{'='*60}")
     print(f"[✓] DATASET FINAL CREADO")
@@ -214,16 +329,21 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="CyberSen Dataset Builder")
-    parser.add_argument("--input", "-i", default="data/", help="Carpeta con CSVs")
-    parser.add_argument("--output", "-o", default="data/final_dataset.csv", help="Archivo de salida")
+    parser.add_argument("--input", "-i", default="data/", help="Carpeta con datasets (Parquet/CSV)")
+    parser.add_argument("--output", "-o", default=None, help="Archivo de salida (por defecto: data/final_dataset.<formato>)")
     parser.add_argument("--no-balance", action="store_true", help="No balancear dataset")
+    parser.add_argument("--shuffle", action="store_true", help="Mezclar las filas antes de guardar")
+    parser.add_argument("--format", choices=["parquet", "csv"], default=DEFAULT_FORMAT,
+                        help=f"Formato de salida (por defecto: {DEFAULT_FORMAT})")
     
     args = parser.parse_args()
     
     success = build_dataset(
         input_folder=args.input,
         output_file=args.output,
-        balance=not args.no_balance
+        balance=not args.no_balance,
+        output_format=args.format,
+        shuffle_rows=args.shuffle
     )
     
     import sys
@@ -7,7 +7,11 @@ from scapy.all import *
 import os
 import sys
 
-def capture_packets(interface="wlan0", output_file="data/capture.pcap", duration=60):
+# Filtro BPF: solo tramas 802.11 (gestión, control y datos). El kernel
+# descarta el resto sin copiarlo a espacio de usuario
+DOT11_BPF = "type mgt or type ctl or type data"
+
+def capture_packets(interface="wlan0", output_file="data/capture.pcap", duration=60, bpf_filter=DOT11_BPF):
     """
     Captura paquetes WiFi en modo monitor
     
@@ -15,6 +19,7 @@ def capture_packets(interface="wlan0", output_file="data/capture.pcap", duration
         interface: Interfaz en modo monitor
         output_file: Archivo de salida .pcap
         duration: Duración de captura en segundos
+        bpf_filter: Filtro BPF aplicado en el kernel (None o "" para desactivarlo)
     """
     # Crear directorio data si no existe
     os.makedirs("data", exist_ok=True)
@@ -24,20 +29,31 @@ def capture_packets(interface="wlan0", output_file="data/capture.pcap", duration
     print(f"[*] Archivo: {output_file}")
     print(f"[*] Capturando...\n")
     
+    captured = 0
+    writer = None
+    
     try:
+        # Escritura incremental: cada paquete va directo a disco (store=False),
+        # la memoria no crece con la duración de la captura
+        writer = PcapWriter(output_file, append=False, sync=True)
+        
+        def write_packet(pkt):
+            nonlocal captured
+            writer.write(pkt)
+            captured += 1
+        
         # Captura con filtro BPF para solo 802.11
-        packets = sniff(
+        sniff(
             iface=interface,
             timeout=duration,
             monitor=True,
-            store=True
+            store=False,
+            prn=write_packet,
+            filter=bpf_filter or None
         )
         
-        # Guardar captura
-        wrpcap(output_file, packets)
-        
         print(f"\n[✓] Captura completada")
-        print(f"[✓] Total de paquetes capturados: {len(packets)}")
+        print(f"[✓] Total de paquetes capturados: {captured}")
         print(f"[✓] Guardado en: {output_file}")
         
         return True
@@ -53,6 +69,9 @@ def capture_packets(interface="wlan0", output_file="data/capture.pcap", duration
     except Exception as e:
         print(f"[!] Error inesperado: {e}")
         return False
+    finally:
+        if writer is not None:
+            writer.close()
 
 if __name__ == "__main__":
     # Permitir argumentos opcionales
@@ -62,13 +81,15 @@ if __name__ == "__main__":
     parser.add_argument("--interface", "-i", default="wlan0", help="Interfaz de red")
     parser.add_argument("--duration", "-d", type=int, default=60, help="Duración en segundos")
     parser.add_argument("--output", "-o", default="data/capture.pcap", help="Archivo de salida")
+    parser.add_argument("--filter", "-f", default=DOT11_BPF, help="Filtro BPF (\"\" para desactivarlo)")
     
     args = parser.parse_args()
     
     success = capture_packets(
         interface=args.interface,
         output_file=args.output,
-        duration=args.duration
+        duration=args.duration,
+        bpf_filter=args.filter
     )
     
     sys.exit(0 if success else 1)
@@ -6,13 +6,187 @@ Soporta múltiples capturas de tráfico normal (trafico_normal_1.pcap, trafico_n
 """
 from scapy.all import *
 import pandas as pd
+import numpy as np
 import os
 import glob
 import re
-from collections import defaultdict
+import functools
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import warnings
 warnings.filterwarnings('ignore')
 
+# Numba (opcional) compila a código nativo el etiquetado automático por MAC
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Parquet (columnar, comprimido, conserva tipos) si pyarrow está disponible;
+# CSV como alternativa por compatibilidad
+try:
+    import pyarrow  # noqa: F401
+    DEFAULT_FORMAT = 'parquet'
+except ImportError:
+    DEFAULT_FORMAT = 'csv'
+
+# trafico_normal.pcap o trafico_normal_1.pcap hasta trafico_normal_10.pcap
+_NORMAL_RE = re.compile(r'trafico_normal(_\d{1,2})?\.pcap')
+
+def u64_to_mac(value):
+    """Convierte un entero de 48 bits a MAC en formato 'aa:bb:cc:dd:ee:ff'"""
+    h = f"{int(value):012x}"
+    return ":".join(h[i:i + 2] for i in range(0, 12, 2))
+
+def macs_to_str(column):
+    """
+    Formatea una columna de MACs uint64 a texto
+    Solo se formatean los valores únicos y se expanden como categórica
+    """
+    codes, uniques = pd.factorize(column)
+    return pd.Categorical.from_codes(codes, [u64_to_mac(v) for v in uniques])
+
+def save_dataset(df, output_file):
+    """
+    Guarda el dataset de features en CSV o Parquet (según la extensión)
+    Las MAC se mantienen como uint64 durante el procesamiento y solo
+    se convierten a texto al exportar
+    """
+    df = df.copy()
+    for col in ("src_mac", "dst_mac"):
+        if col in df.columns:
+            df[col] = macs_to_str(df[col])
+    
+    if output_file.endswith(".parquet"):
+        df.to_parquet(output_file, index=False, compression="zstd")
+    else:
+        df.to_csv(output_file, index=False)
+
+# Tipos de enlace (DLT) de las capturas WiFi
+DLT_IEEE802_11 = 105        # 802.11 sin cabecera de radio
+DLT_IEEE802_11_RADIO = 127  # 802.11 con cabecera RadioTap
+
+# Otros encapsulados 802.11 que sí requieren disección con Scapy
+# (Prism, AVS, PPI); cualquier otro tipo de enlace se descarta sin diseccionar
+DLT_DOT11_SCAPY = {119, 163, 192}
+
+# Campos RadioTap anteriores a dBm_AntSignal (bit 5): (bit, alineación, tamaño)
+_RADIOTAP_FIELDS = (
+    (0, 8, 8),  # TSFT
+    (1, 1, 1),  # Flags
+    (2, 1, 1),  # Rate
+    (3, 2, 4),  # Channel
+    (4, 1, 2),  # FHSS
+)
+
+def radiotap_dbm_signal(data):
+    """
+    Lee dBm_AntSignal directamente de los bytes de la cabecera RadioTap
+    
+    Args:
+        data: Bytes del paquete (empieza por la cabecera RadioTap)
+    
+    Returns:
+        int: Señal en dBm o None si el campo no está presente
+    """
+    if len(data) < 8:
+        return None
+    
+    # Los offsets se acotan a los bytes capturados: una trama truncada puede
+    # declarar una cabecera RadioTap más larga que los datos
+    it_len = min(data[2] | (data[3] << 8), len(data))
+    present = int.from_bytes(data[4:8], 'little')
+    
+    # Saltar los bitmaps "present" extendidos (bit 31 activo)
+    offset = 8
+    word = present
+    while word & 0x80000000 and offset + 4 <= it_len:
+        word = int.from_bytes(data[offset:offset + 4], 'little')
+        offset += 4
+    
+    if not present & 0x20:
+        return None
+    
+    for bit, align, size in _RADIOTAP_FIELDS:
+        if present & (1 << bit):
+            offset = (offset + align - 1) & ~(align - 1)
+            offset += size
+    
+    if offset >= it_len:
+        return None
+    
+    value = data[offset]
+    return value - 256 if value > 127 else value
+
+def parse_dot11_frame(data, linktype):
+    """
+    Decodifica los campos necesarios de una trama 802.11 a partir de sus bytes
+    Evita la disección completa de Scapy en el bucle de lectura
+    
+    Args:
+        data: Bytes del paquete tal como están en el pcap
+        linktype: Tipo de enlace (DLT) del paquete
+    
+    Returns:
+        tuple: (subtype, rssi, fc_flags, src_mac, dst_mac) con las MAC como
+        enteros de 48 bits, o None si el paquete no es 802.11
+    """
+    rssi = None
+    
+    if linktype == DLT_IEEE802_11_RADIO:
+        if len(data) < 4:
+            return None
+        rssi = radiotap_dbm_signal(data)
+        raw = data[data[2] | (data[3] << 8):]
+    elif linktype == DLT_IEEE802_11:
+        raw = data
+    elif linktype in DLT_DOT11_SCAPY:
+        # Otros encapsulados (PPI, Prism...): disección con Scapy
+        cls = conf.l2types.get(linktype)
+        if cls is None:
+            return None
+        pkt = cls(data)
+        if not pkt.haslayer(Dot11):
+            return None
+        rssi = getattr(pkt, "dBm_AntSignal", None)
+        raw = bytes(pkt[Dot11])
+    else:
+        # No es una captura 802.11 (Ethernet, etc.)
+        return None
+    
+    if len(raw) < 10:
+        return None
+    
+    fc0, fc_flags = raw[0], raw[1]
+    frame_type = (fc0 >> 2) & 0x3
+    subtype = (fc0 >> 4) & 0xF
+    
+    # addr2 existe salvo en tramas de control cortas (ACK, CTS...);
+    # addr3 solo en tramas de gestión y datos
+    has_addr2 = frame_type != 1 or subtype in (8, 9, 10, 11, 14, 15)
+    has_addr3 = frame_type in (0, 2)
+    src_mac = int.from_bytes(raw[10:16], 'big') if has_addr2 and len(raw) >= 16 else 0
+    dst_mac = int.from_bytes(raw[16:22], 'big') if has_addr3 and len(raw) >= 22 else 0
+    
+    if rssi is None:
+        rssi = -70
+    
+    return subtype, rssi, fc_flags, src_mac, dst_mac
+
+def packet_timestamp(meta, nano=False):
+    """
+    Timestamp en segundos a partir de los metadatos de RawPcapReader (pcap o pcapng)
+    
+    Args:
+        meta: Metadatos del paquete
+        nano: True si el pcap tiene resolución de nanosegundos (magic a1b23c4d);
+              en ese caso meta.usec contiene nanosegundos
+    """
+    if hasattr(meta, "sec"):
+        return meta.sec + meta.usec / (1e9 if nano else 1e6)
+    return ((meta.tshigh << 32) + meta.tslow) / meta.tsresol
+
+@functools.lru_cache(maxsize=64)
 def detect_attack_type_from_filename(filename):
     """
     Detecta el tipo de ataque basándose en el nombre del archivo
@@ -33,7 +207,7 @@ def detect_attack_type_from_filename(filename):
     
     # Detectar trafico_normal (con o sin número)
     # trafico_normal.pcap o trafico_normal_1.pcap hasta trafico_normal_10.pcap
-    if re.match(r'trafico_normal(_\d{1,2})?\.pcap', filename_lower):
+    if _NORMAL_RE.match(filename_lower):
         return 'normal'
     
     # Detectar otros tipos de ataques
@@ -46,92 +220,143 @@ def detect_attack_type_from_filename(filename):
     
     return None
 
-def detect_label_conservative(pkt, stats, filename=""):
+def detect_labels_conservative(df, attack_type=None):
     """
     Etiqueta paquetes de manera CONSERVADORA
     Solo marca como ataque si hay evidencia MUY CLARA
     
+    Trabaja sobre todas las filas a la vez (comparaciones NumPy) en lugar
+    de etiquetar paquete a paquete
+    
     Args:
-        pkt: Paquete Scapy
-        stats: Diccionario con estadísticas de red
-        filename: Nombre del archivo para detectar etiquetas manuales
+        df: DataFrame con columnas frame_type, src_mac y time (segundos)
+        attack_type: Tipo detectado del nombre del archivo (ver
+            detect_attack_type_from_filename), resuelto una vez por pcap
     
     Returns:
-        str: Etiqueta del paquete
+        Categorical: Etiqueta de cada paquete
     """
-    if not pkt.haslayer(Dot11):
-        return "normal"
-    
-    subtype = pkt[Dot11].subtype
-    src_mac = pkt.addr2 if pkt.addr2 else "00:00:00:00:00:00"
+    subtype = df["frame_type"].to_numpy()
+    labels = np.full(len(df), "normal", dtype=object)
     
     # ═══════════════════════════════════════════════════════════
     # PRIORIDAD 1: Etiquetado manual basado en el nombre del archivo
     # ═══════════════════════════════════════════════════════════
     
-    attack_type = detect_attack_type_from_filename(filename)
+    # Si el archivo indica un tipo específico, etiquetar según el subtype
+    if attack_type == 'normal':
+        return pd.Categorical(labels)
+    elif attack_type == 'rogue_ap':
+        # Rogue AP puede ser beacon (8) o probe response (5)
+        labels[np.isin(subtype, [8, 5])] = 'rogue_ap'
+        return pd.Categorical(labels)
+    elif attack_type == 'deauth':
+        manual = subtype == 12
+    elif attack_type == 'beacon_flood':
+        manual = subtype == 8
+    else:
+        manual = np.zeros(len(df), dtype=bool)
     
-    if attack_type:
-        # Si el archivo indica un tipo específico, etiquetar según el subtype
-        if attack_type == 'normal':
-            return 'normal'
-        elif attack_type == 'deauth' and subtype == 12:
-            return 'deauth'
-        elif attack_type == 'beacon_flood' and subtype == 8:
-            return 'beacon_flood'
-        elif attack_type == 'rogue_ap':
-            # Rogue AP puede ser beacon (8) o probe response (5)
-            if subtype in [8, 5]:
-                return 'rogue_ap'
-            return 'normal'
+    labels[manual] = attack_type
     
     # ═══════════════════════════════════════════════════════════
     # PRIORIDAD 2: Etiquetado automático MUY CONSERVADOR
-    # Solo si NO hay nombre descriptivo en el archivo
+    # Solo para paquetes no etiquetados por el nombre del archivo
     # ═══════════════════════════════════════════════════════════
     
-    # Inicializar estadísticas
-    if src_mac not in stats['mac_counts']:
-        stats['mac_counts'][src_mac] = {
-            'deauth': 0, 
-            'beacon': 0, 
-            'total': 0,
-            'first_seen': pkt.time
-        }
-    
-    stats['mac_counts'][src_mac]['total'] += 1
-    current_time = pkt.time
-    time_window = current_time - stats['mac_counts'][src_mac]['first_seen']
+    auto = ~manual
+    if not auto.any():
+        return pd.Categorical(labels)
+    
+    if njit is not None:
+        codes = _auto_label_codes(
+            df["time"].to_numpy()[auto],
+            df["src_mac"].to_numpy()[auto],
+            subtype[auto]
+        )
+        auto_labels = _AUTO_LABELS[codes]
+    else:
+        auto_labels = _auto_labels_pandas(df.loc[auto, ["frame_type", "src_mac", "time"]])
     
-    # Deauth Attack: THRESHOLD MUY ALTO
-    if subtype == 12:  # Deauthentication
-        stats['mac_counts'][src_mac]['deauth'] += 1
+    # Todo lo demás es NORMAL
+    labels[auto] = auto_labels
+    return pd.Categorical(labels)
+
+# Códigos del etiquetado automático → etiqueta
+_AUTO_LABELS = np.array(["normal", "deauth", "beacon_flood"], dtype=object)
+
+if njit is not None:
+    @njit(cache=True)
+    def _auto_label_codes(times, macs, subtypes):
+        """
+        Máquina de estados por MAC del etiquetado automático, en una pasada
+        Devuelve un código por paquete (índice en _AUTO_LABELS)
+        """
+        n = len(times)
+        codes = np.zeros(n, dtype=np.int8)
+        slots = dict()
+        first_seen = np.empty(n, dtype=np.float64)
+        deauth_count = np.zeros(n, dtype=np.int64)
+        beacon_count = np.zeros(n, dtype=np.int64)
+        used = 0
         
-        # Solo etiquetar como ataque si hay MUCHÍSIMOS deauth en poco tiempo
-        if time_window > 0:
-            deauth_rate = stats['mac_counts'][src_mac]['deauth'] / time_window
+        for i in range(n):
+            mac = macs[i]
+            if mac in slots:
+                j = slots[mac]
+            else:
+                j = used
+                slots[mac] = j
+                first_seen[j] = times[i]
+                used += 1
             
-            # Requiere más de 10 deauth POR SEGUNDO (muy agresivo)
-            if deauth_rate > 10 and stats['mac_counts'][src_mac]['deauth'] > 50:
-                return "deauth"
-        
-        return "normal"
-    
-    # Beacon Flood: THRESHOLD MUY ALTO
-    elif subtype == 8:  # Beacon
-        stats['mac_counts'][src_mac]['beacon'] += 1
-        
-        if time_window > 0:
-            beacon_rate = stats['mac_counts'][src_mac]['beacon'] / time_window
+            time_window = times[i] - first_seen[j]
             
-            # Requiere más de 100 beacons POR SEGUNDO (anormal)
-            if beacon_rate > 100 and stats['mac_counts'][src_mac]['beacon'] > 500:
-                return "beacon_flood"
+            # Deauth Attack: requiere más de 10 deauth POR SEGUNDO (muy agresivo)
+            if subtypes[i] == 12:
+                deauth_count[j] += 1
+                if time_window > 0 and deauth_count[j] / time_window > 10 and deauth_count[j] > 50:
+                    codes[i] = 1
+            
+            # Beacon Flood: requiere más de 100 beacons POR SEGUNDO (anormal)
+            elif subtypes[i] == 8:
+                beacon_count[j] += 1
+                if time_window > 0 and beacon_count[j] / time_window > 100 and beacon_count[j] > 500:
+                    codes[i] = 2
         
-        return "normal"
-    
-    # Todo lo demás es NORMAL
-    return "normal"
+        return codes
+
+def _auto_labels_pandas(sub):
+    """
+    Etiquetado automático con operaciones vectorizadas de pandas
+    (alternativa cuando Numba no está instalado)
+    """
+    by_mac = sub.groupby("src_mac", sort=False)
+    
+    # Ventana desde el primer paquete visto de cada MAC
+    time_window = (sub["time"] - by_mac["time"].transform("first")).to_numpy()
+    
+    is_deauth = (sub["frame_type"] == 12).astype(np.int32)  # Deauthentication
+    is_beacon = (sub["frame_type"] == 8).astype(np.int32)   # Beacon
+    
+    # Conteos acumulados por MAC hasta cada paquete
+    deauth_count = is_deauth.groupby(sub["src_mac"], sort=False).cumsum().to_numpy()
+    beacon_count = is_beacon.groupby(sub["src_mac"], sort=False).cumsum().to_numpy()
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deauth_rate = np.where(time_window > 0, deauth_count / time_window, 0.0)
+        beacon_rate = np.where(time_window > 0, beacon_count / time_window, 0.0)
+    
+    return np.select(
+        [
+            # Deauth Attack: requiere más de 10 deauth POR SEGUNDO (muy agresivo)
+            is_deauth.to_numpy().astype(bool) & (deauth_rate > 10) & (deauth_count > 50),
+            # Beacon Flood: requiere más de 100 beacons POR SEGUNDO (anormal)
+            is_beacon.to_numpy().astype(bool) & (beacon_rate > 100) & (beacon_count > 500),
+        ],
+        ["deauth", "beacon_flood"],
+        default="normal"
+    )
 
 def extract_features_from_single_pcap(pcap_file):
     """
@@ -157,113 +382,140 @@ def extract_features_from_single_pcap(pcap_file):
         print(f"[!] Error: No se encontró {pcap_file}")
         return None
     
-    try:
-        packets = rdpcap(pcap_file)
-        print(f"[*] Total de paquetes: {len(packets)}")
-    except Exception as e:
-        print(f"[!] Error leyendo pcap: {e}")
-        return None
-    
-    rows = []
-    stats = {
-        'mac_counts': defaultdict(dict),
-        'time_window': defaultdict(list)
-    }
-    
+    # Columnas acumuladas en buffers tipados (array.array) en lugar de listas
+    # de objetos Python: crecen por bloques sin un objeto por valor y al final
+    # se exponen a NumPy sin copia (int8/int16/float64/uint64)
+    frame_types = array('b')
+    rssis = array('h')
+    times = array('d')
+    src_macs = array('Q')
+    dst_macs = array('Q')
+    retries = array('b')
+    power_mgmts = array('b')
+    
+    total_count = 0
     dot11_count = 0
     
-    for pkt in packets:
-        if pkt.haslayer(Dot11):
-            dot11_count += 1
-            try:
-                # Extraer características básicas
-                subtype = pkt[Dot11].subtype
-                rssi = pkt.dBm_AntSignal if hasattr(pkt, "dBm_AntSignal") else -70
-                src_mac = pkt.addr2 if pkt.addr2 else "00:00:00:00:00:00"
-                dst_mac = pkt.addr3 if pkt.addr3 else "00:00:00:00:00:00"
+    # Lectura en streaming: memoria constante sin importar el tamaño del pcap
+    # RawPcapReader entrega los bytes sin diseccionar; la cabecera 802.11
+    # se decodifica directamente con parse_dot11_frame
+    try:
+        with RawPcapReader(pcap_file) as reader:
+            nano = getattr(reader, "nano", False)
+            for data, meta in reader:
+                total_count += 1
                 
-                # Características adicionales
-                frame_control = pkt[Dot11].FCfield
-                retry = 1 if frame_control & 0x08 else 0
-                power_mgmt = 1 if frame_control & 0x10 else 0
+                linktype = getattr(meta, "linktype", None) or reader.linktype
                 
-                # Frecuencia (2.4 GHz por defecto)
-                freq = 2412
+                try:
+                    fields = parse_dot11_frame(data, linktype)
+                except Exception as e:
+                    continue
                 
-                # Timestamp
-                pkt_time = float(pkt.time)
+                if fields is None:
+                    continue
                 
-                # Detectar etiqueta (CONSERVADOR)
-                label = detect_label_conservative(pkt, stats, base_filename)
+                dot11_count += 1
                 
-                rows.append({
-                    "frame_type": subtype,
-                    "rssi": rssi,
-                    "packet_rate": 1,  # Se calculará después
-                    "time": pkt_time,
-                    "src_mac": src_mac,
-                    "dst_mac": dst_mac,
-                    "freq": freq,
-                    "retry": retry,
-                    "power_mgmt": power_mgmt,
-                    "label": label
-                })
+                # Extraer características básicas
+                subtype, rssi, frame_control, src_mac, dst_mac = fields
                 
-            except Exception as e:
-                continue
+                frame_types.append(subtype)
+                rssis.append(rssi)
+                times.append(packet_timestamp(meta, nano))
+                src_macs.append(src_mac)
+                dst_macs.append(dst_mac)
+                # Características adicionales
+                retries.append(1 if frame_control & 0x08 else 0)
+                power_mgmts.append(1 if frame_control & 0x10 else 0)
+    except Exception as e:
+        print(f"[!] Error leyendo pcap: {e}")
+        return None
     
+    print(f"[*] Total de paquetes: {total_count}")
     print(f"[*] Paquetes 802.11 procesados: {dot11_count}")
     
-    if len(rows) == 0:
+    if len(frame_types) == 0:
         print("[!] No se extrajeron características de este archivo.")
         return None
     
-    # Crear DataFrame
-    df = pd.DataFrame(rows)
+    # Crear DataFrame a partir de arrays columnares (SoA)
+    n = len(frame_types)
+    df = pd.DataFrame({
+        "frame_type": np.frombuffer(frame_types, dtype=np.int8),
+        "rssi": np.frombuffer(rssis, dtype=np.int16),
+        "packet_rate": np.ones(n, dtype=np.int32),  # Se calculará después
+        "time": np.frombuffer(times, dtype=np.float64),
+        "src_mac": np.frombuffer(src_macs, dtype=np.uint64),
+        "dst_mac": np.frombuffer(dst_macs, dtype=np.uint64),
+        "freq": np.full(n, 2412, dtype=np.int16),  # Frecuencia (2.4 GHz por defecto)
+        "retry": np.frombuffer(retries, dtype=np.int8),
+        "power_mgmt": np.frombuffer(power_mgmts, dtype=np.int8)
+    })
+    
+    # Detectar etiquetas (CONSERVADOR) en una sola pasada vectorizada
+    df["label"] = detect_labels_conservative(df, attack_type)
     
     # Convertir tiempo a datetime
     df["time"] = pd.to_datetime(df["time"], unit="s")
     
     # Ordenar por tiempo
-    df.sort_values("time", inplace=True)
+    df.sort_values("time", inplace=True, kind="mergesort")
+    df.reset_index(drop=True, inplace=True)
     
     # Calcular packet_rate de manera robusta
+    # Paquetes de la misma MAC dentro del mismo segundo: groupby hash sobre
+    # (src_mac, segundo) y transform para devolver el conteo a cada fila,
+    # sin rolling ni merge posterior
     print(f"[*] Calculando packet_rate...")
     
-    df_temp = df.reset_index(drop=True).copy()
-    
-    packet_rates = []
-    for src_mac in df_temp['src_mac'].unique():
-        mask = df_temp['src_mac'] == src_mac
-        mac_df = df_temp[mask].copy()
-        
-        mac_df.set_index('time', inplace=True)
-        
-        rate = mac_df['frame_type'].rolling('1s', min_periods=1).count()
-        
-        for idx, val in rate.items():
-            packet_rates.append({
-                'time': idx,
-                'src_mac': src_mac,
-                'rate': int(val)
-            })
-    
-    rate_df = pd.DataFrame(packet_rates)
-    
-    df = df.merge(
-        rate_df,
-        on=['time', 'src_mac'],
-        how='left'
+    second = df["time"].astype("int64") // 1_000_000_000  # ns → s
+    df["packet_rate"] = (
+        df.groupby([df["src_mac"], second], sort=False)["frame_type"]
+        .transform("size")
+        .astype("int32")
     )
     
-    df['packet_rate'] = df['rate'].fillna(1).astype(int)
-    df.drop(columns=['rate'], inplace=True, errors='ignore')
-    
     return df
 
-def extract_features_from_all_pcaps(input_folder="data/", output_folder="data/"):
+def process_pcap_to_dataset(pcap_file, output_folder="data/", output_format=DEFAULT_FORMAT):
+    """
+    Extrae features de un pcap y guarda su *_dataset.parquet (o .csv)
+    Se ejecuta dentro de un proceso trabajador, así el proceso principal
+    nunca mantiene en memoria los DataFrames de todos los archivos
+    
+    Args:
+        pcap_file: Archivo .pcap a procesar
+        output_folder: Carpeta donde guardar el dataset
+        output_format: 'parquet' o 'csv'
+    
+    Returns:
+        tuple: (output_file, filas, distribución de etiquetas) o None si no hay datos
+    """
+    df = extract_features_from_single_pcap(pcap_file)
+    
+    if df is None or len(df) == 0:
+        return None
+    
+    base_name = os.path.splitext(os.path.basename(pcap_file))[0]
+    output_file = os.path.join(output_folder, f"{base_name}_dataset.{output_format}")
+    
+    save_dataset(df, output_file)
+    
+    label_counts = {str(label): int(count) for label, count in df["label"].value_counts().items()}
+    return output_file, len(df), label_counts
+
+def extract_features_from_all_pcaps(input_folder="data/", output_folder="data/", max_workers=None,
+                                    output_format=DEFAULT_FORMAT):
     """
     Procesa TODOS los archivos .pcap en la carpeta
+    Cada archivo es independiente, por lo que se reparten entre procesos
+    
+    Args:
+        input_folder: Carpeta con archivos PCAP
+        output_folder: Carpeta para guardar los datasets
+        max_workers: Número de procesos (por defecto os.cpu_count())
+        output_format: 'parquet' o 'csv'
     """
     os.makedirs(input_folder, exist_ok=True)
     os.makedirs(output_folder, exist_ok=True)
@@ -292,30 +544,40 @@ def extract_features_from_all_pcaps(input_folder="data/", output_folder="data/")
     processed_count = 0
     total_rows = 0
     
-    for pcap_file in pcap_files:
-        print(f"\n{'─'*60}")
-        
-        df = extract_features_from_single_pcap(pcap_file)
-        
-        if df is None or len(df) == 0:
-            print(f"[⚠️] Saltando {pcap_file} (sin datos válidos)")
-            continue
-        
-        base_name = os.path.splitext(os.path.basename(pcap_file))[0]
-        output_file = os.path.join(output_folder, f"{base_name}_dataset.csv")
-        
-        df.to_csv(output_file, index=False)
-        
-        print(f"\n[✓] Features extraídas: {len(df)} filas")
-        print(f"[✓] Guardado en: {output_file}")
-        print(f"\n[*] Distribución de etiquetas:")
-        label_counts = df["label"].value_counts()
-        for label, count in label_counts.items():
-            pct = (count / len(df)) * 100
-            print(f"   {label}: {count} ({pct:.2f}%)")
+    workers = min(max_workers or os.cpu_count() or 1, len(pcap_files))
+    print(f"[*] Procesando con {workers} proceso(s) en paralelo...")
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_pcap_to_dataset, pcap_file, output_folder, output_format): pcap_file
+            for pcap_file in pcap_files
+        }
         
-        processed_count += 1
-        total_rows += len(df)
+        for future in as_completed(futures):
+            pcap_file = futures[future]
+            print(f"\n{'─'*60}")
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[!] Error procesando {pcap_file}: {e}")
+                continue
+            
+            if result is None:
+                print(f"[⚠️] Saltando {pcap_file} (sin datos válidos)")
+                continue
+            
+            output_file, n_rows, label_counts = result
+            
+            print(f"[✓] {os.path.basename(pcap_file)}: {n_rows} filas extraídas")
+            print(f"[✓] Guardado en: {output_file}")
+            print(f"\n[*] Distribución de etiquetas:")
+            for label, count in label_counts.items():
+                pct = (count / n_rows) * 100
+                print(f"   {label}: {count} ({pct:.2f}%)")
+            
+            processed_count += 1
+            total_rows += n_rows
     
     print(f"\n{'='*60}")
     print(f"[✓] RESUMEN FINAL")
@@ -338,8 +600,11 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="CyberSen Feature Extraction (Conservative)")
     parser.add_argument("--input-folder", "-i", default="data/", help="Carpeta con archivos PCAP")
-    parser.add_argument("--output-folder", "-o", default="data/", help="Carpeta para guardar CSVs")
+    parser.add_argument("--output-folder", "-o", default="data/", help="Carpeta para guardar los datasets")
     parser.add_argument("--single-file", "-f", help="Procesar un solo archivo PCAP específico")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Procesos en paralelo (por defecto: nº de CPUs)")
+    parser.add_argument("--format", choices=["parquet", "csv"], default=DEFAULT_FORMAT,
+                        help=f"Formato de salida (por defecto: {DEFAULT_FORMAT})")
     
     args = parser.parse_args()
     
@@ -347,14 +612,16 @@ if __name__ == "__main__":
         df = extract_features_from_single_pcap(args.single_file)
         if df is not None:
             base_name = os.path.splitext(os.path.basename(args.single_file))[0]
-            output_file = os.path.join(args.output_folder, f"{base_name}_dataset.csv")
-            df.to_csv(output_file, index=False)
+            output_file = os.path.join(args.output_folder, f"{base_name}_dataset.{args.format}")
+            save_dataset(df, output_file)
             print(f"\n[✓] Dataset guardado: {output_file}")
             success = True
         else:
             success = False
     else:
-        success = extract_features_from_all_pcaps(args.input_folder, args.output_folder)
+        success = extract_features_from_all_pcaps(
+            args.input_folder, args.output_folder, args.workers, args.format
+        )
     
     import sys
     sys.exit(0 if success else 1)
@@ -6,24 +6,290 @@ Versión mejorada con detección de Beacon Flood corregida
 """
 from scapy.all import *
 import joblib
-import pandas as pd
+import numpy as np
+import sklearn
+from threadpoolctl import threadpool_limits
 import time
-from collections import deque, defaultdict
-from datetime import datetime
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from enum import IntEnum
+import io
 import os
+import queue
+import socket
+import sys
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
+# Filtro BPF por defecto: solo tramas de gestión que el detector analiza
+# (deauth, beacon, probe response y auth). El kernel descarta el resto
+# (datos, ACK, RTS/CTS...) antes de que lleguen a Scapy
+DEFAULT_BPF = ("wlan type mgt and (wlan subtype deauth or wlan subtype beacon "
+               "or wlan subtype probe-resp or wlan subtype auth)")
+
+# Protocolo para recibir todas las tramas en el socket AF_PACKET
+ETH_P_ALL = 0x0003
+
+# Tipo de enlace (ARPHRD) de una interfaz en modo monitor con cabecera RadioTap
+ARPHRD_IEEE80211_RADIOTAP = 803
+
+def interface_link_type(interface):
+    """
+    Tipo ARPHRD de una interfaz según /sys/class/net/<interface>/type
+    
+    Returns:
+        int: Tipo de enlace o None si no se puede leer
+    """
+    try:
+        with open(f"/sys/class/net/{interface}/type") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+# Buffer de recepción del kernel para el socket crudo (absorbe ráfagas
+# mientras el hilo de análisis está ocupado con el modelo)
+CAPTURE_BUFSIZE = 1 << 22
+
+# Campos RadioTap anteriores a dBm_AntSignal (bit 5): (bit, alineación, tamaño)
+_RADIOTAP_FIELDS = (
+    (0, 8, 8),  # TSFT
+    (1, 1, 1),  # Flags
+    (2, 1, 1),  # Rate
+    (3, 2, 4),  # Channel
+    (4, 1, 2),  # FHSS
+)
+
+def parse_radiotap_frame(data):
+    """
+    Decodifica una trama RadioTap + 802.11 recibida del socket crudo
+    Solo se leen los campos que usa el detector (sin disección de Scapy)
+    
+    Args:
+        data: Bytes (o memoryview) de la trama
+    
+    Returns:
+        tuple: (subtype, rssi, fc_flags, src_mac) o None si la trama es inválida
+    """
+    if len(data) < 8:
+        return None
+    
+    # Trama truncada: la cabecera RadioTap declarada no cabe en los datos
+    it_len = data[2] | (data[3] << 8)
+    if it_len < 8 or len(data) < it_len:
+        return None
+    present = int.from_bytes(data[4:8], 'little')
+    
+    # RSSI (dBm_AntSignal): saltar bitmaps extendidos y campos anteriores
+    rssi = -70
+    if present & 0x20:
+        offset = 8
+        word = present
+        while word & 0x80000000 and offset + 4 <= it_len:
+            word = int.from_bytes(data[offset:offset + 4], 'little')
+            offset += 4
+        for bit, align, size in _RADIOTAP_FIELDS:
+            if present & (1 << bit):
+                offset = (offset + align - 1) & ~(align - 1)
+                offset += size
+        if offset < it_len:
+            value = data[offset]
+            rssi = value - 256 if value > 127 else value
+    
+    # Cabecera 802.11
+    if len(data) < it_len + 16:
+        return None
+    
+    fc0 = data[it_len]
+    fc_flags = data[it_len + 1]
+    frame_type = (fc0 >> 2) & 0x3
+    subtype = (fc0 >> 4) & 0xF
+    
+    # addr2 existe salvo en tramas de control cortas (ACK, CTS...)
+    if frame_type == 1 and subtype not in (8, 9, 10, 11, 14, 15):
+        src_mac = None
+    else:
+        src_mac = data[it_len + 10:it_len + 16].hex(':')
+    
+    return subtype, rssi, fc_flags, src_mac
+
+# onnxruntime (opcional) ejecuta el modelo exportado por train_model.py
+# Sus errores (Fail, InvalidArgument...) no heredan de ValueError: el
+# adaptador de _load_onnx los convierte para que _flush los trate igual
+try:
+    import onnxruntime as ort
+    from onnxruntime.capi import onnxruntime_pybind11_state as _ort_state
+    ORT_ERRORS = tuple(
+        getattr(_ort_state, name)
+        for name in ("Fail", "InvalidArgument", "InvalidGraph", "RuntimeException",
+                     "NotImplemented", "InvalidProtobuf", "EPFail")
+        if hasattr(_ort_state, name)
+    )
+except ImportError:
+    ort = None
+    ORT_ERRORS = ()
+
+# Numba (opcional) compila los núcleos numéricos del análisis por MAC
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+class Attack(IntEnum):
+    """Etiquetas que maneja el detector como enteros pequeños"""
+    NORMAL = 0
+    DEAUTH = 1
+    BEACON_FLOOD = 2
+    ROGUE_AP = 3
+
+# Nombre de cada etiqueta (índice = valor de Attack), tal como las predice el modelo
+ATTACK_NAMES = ('normal', 'deauth', 'beacon_flood', 'rogue_ap')
+_LABEL_TO_ATTACK = {name: Attack(i) for i, name in enumerate(ATTACK_NAMES)}
+ATTACK_EMOJI = ('✅', '🚨', '⚠️', '🔴')
+
+# Expresión de cada feature que el detector calcula por paquete, en función
+# de los argumentos del extractor generado (ver _build_extractor)
+COL_EXPR = {
+    'frame_type': 'subtype',
+    'rssi': 'rssi',
+    'packet_rate': 'pr',
+    'freq': '2412',
+    'retry': '(fc_flags >> 3) & 1',
+    'power_mgmt': '(fc_flags >> 4) & 1',
+}
+
+# Textos de cada alerta por tipo de ataque
+ALERT_INFO = {
+    Attack.DEAUTH: {
+        'symbol': '🚨',
+        'severity': 'ALTA',
+        'title': 'ATAQUE DEAUTH',
+        'description': 'Intento de desconectar dispositivos de la red WiFi'
+    },
+    Attack.BEACON_FLOOD: {
+        'symbol': '⚠️',
+        'severity': 'MEDIA',
+        'title': 'ATAQUE BEACON FLOOD',
+        'description': 'Inundación de redes WiFi falsas para confundir dispositivos'
+    },
+    Attack.ROGUE_AP: {
+        'symbol': '🔴',
+        'severity': 'ALTA',
+        'title': 'ATAQUE ROGUE AP',
+        'description': 'Punto de acceso falso intentando suplantar red legítima'
+    }
+}
+DEFAULT_ALERT_INFO = {
+    'symbol': '⚡',
+    'severity': 'MEDIA',
+    'title': 'ACTIVIDAD SOSPECHOSA',
+    'description': 'Comportamiento anormal detectado en la red'
+}
+
+# Segundos entre resúmenes de actividad
+STATS_INTERVAL = 2.0
+
+# Estadísticas por MAC (estructura de arrays): (atributo, dtype, ancho)
+# Cada campo es un ndarray con una fila por MAC; ancho None = columna única
+BEACON_WINDOW = 100  # timestamps de beacons guardados por MAC
+_MAC_FIELDS = (
+    ('_deauth_count', np.uint32, None),
+    ('_beacon_count', np.uint32, None),
+    ('_total', np.uint32, None),
+    ('_first_seen', np.float64, None),
+    ('_last_alert', np.float64, None),
+    ('_last_alert_type', np.uint8, None),   # 0 (NORMAL) = sin alertas previas
+    ('_beacon_head', np.int64, None),       # siguiente posición del anillo
+    ('_beacon_times', np.float64, BEACON_WINDOW),
+)
+
+def _beacon_rate(times, head, count):
+    """
+    Tasa de beacons (por segundo) del anillo de timestamps de una MAC
+    
+    Args:
+        times: Fila de _beacon_times de la MAC
+        head: Siguiente posición de escritura del anillo
+        count: Beacons totales de la MAC
+    """
+    window = times.shape[0]
+    n = min(count, window)
+    if n < 5:  # Necesitamos al menos 5 beacons
+        return 0.0
+    
+    # El más reciente está justo antes de head y el más antiguo en head
+    # (anillo lleno) o en la posición 0
+    oldest = times[head] if n == window else times[0]
+    time_window = times[(head - 1) % window] - oldest
+    
+    if time_window < 0.1:  # Evitar división por cero
+        return 0.0
+    
+    return n / time_window
+
+def _update_beacon(beacon_times, beacon_head, beacon_count, slot, now):
+    """Registra un beacon de la fila slot y devuelve su tasa actual"""
+    head = beacon_head[slot]
+    beacon_times[slot, head] = now
+    beacon_head[slot] = (head + 1) % beacon_times.shape[1]
+    beacon_count[slot] += 1
+    return _beacon_rate(beacon_times[slot], beacon_head[slot], beacon_count[slot])
+
+def _update_deauth(deauth_count, first_seen, slot, now, rate_threshold):
+    """Registra un deauth de la fila slot y devuelve True si supera la tasa de ataque"""
+    deauth_count[slot] += 1
+    count = deauth_count[slot]
+    time_active = now - first_seen[slot]
+    return time_active > 1 and count / time_active > rate_threshold and count > 20
+
+if njit is not None:
+    _beacon_rate = njit(cache=True)(_beacon_rate)
+    _update_beacon = njit(cache=True)(_update_beacon)
+    _update_deauth = njit(cache=True)(_update_deauth)
+
+class PredictionHistory:
+    """
+    Últimas predicciones de una MAC con conteo incremental por etiqueta
+    Evita convertir el deque a lista y recorrerlo con .count() en cada paquete
+    """
+    def __init__(self, maxlen=25):
+        self.maxlen = maxlen
+        self.items = deque()
+        self.counts = [0] * len(Attack)
+    
+    def append(self, label):
+        """Añade una predicción descontando la más antigua si está lleno"""
+        if len(self.items) == self.maxlen:
+            self.counts[self.items.popleft()] -= 1
+        self.items.append(label)
+        self.counts[label] += 1
+    
+    def count(self, label):
+        """Número de predicciones de label en la ventana (O(1))"""
+        return self.counts[label]
+    
+    def __len__(self):
+        return len(self.items)
+
 class CyberSenRealTimeDetector:
-    def __init__(self, model_path="model/model.pkl", interface="wlan0"):
+    def __init__(self, model_path="model/model.pkl", interface="wlan0", batch_size=64, batch_timeout=0.05,
+                 bpf_filter=DEFAULT_BPF, capture="scapy", max_macs=4096):
         """
         Inicializa el detector en tiempo real
         
         Args:
             model_path: Ruta al modelo entrenado
             interface: Interfaz de red en modo monitor
+            batch_size: Paquetes que se acumulan antes de llamar al modelo
+            batch_timeout: Segundos máximos que un paquete espera en el lote
+            bpf_filter: Filtro BPF de captura (None o "" para recibir todas las tramas)
+            capture: 'scapy' (sniff) o 'raw' (socket AF_PACKET con parseo directo)
+            max_macs: MACs con historial y estadísticas en memoria (se descartan
+                      las usadas hace más tiempo)
         """
         self.interface = interface
+        self.bpf_filter = bpf_filter or None
+        self.capture = capture
         self.model_path = model_path
         
         # Cargar modelo
@@ -32,6 +298,20 @@ class CyberSenRealTimeDetector:
         
         self.model = joblib.load(model_path)
         
+        # Backend de inferencia: ONNX Runtime si existe un model.onnx
+        # actualizado; si no, el predict de scikit-learn
+        self.predict_batch = self.model.predict
+        self.backend = "scikit-learn"
+        onnx_path = model_path.replace('.pkl', '.onnx')
+        if (ort is not None and os.path.exists(onnx_path)
+                and os.path.getmtime(onnx_path) >= os.path.getmtime(model_path)):
+            try:
+                self.predict_batch = self._load_onnx(onnx_path)
+                self.backend = "onnxruntime"
+            except Exception as e:
+                # .onnx corrupto o incompatible con esta versión de onnxruntime
+                print(f"[⚠️] No se pudo cargar {onnx_path} ({type(e).__name__}): se usa scikit-learn")
+        
         # Cargar features si existen
         features_path = model_path.replace('.pkl', '_features.pkl')
         if os.path.exists(features_path):
@@ -39,24 +319,64 @@ class CyberSenRealTimeDetector:
         else:
             self.feature_cols = ["frame_type", "rssi", "packet_rate", "freq"]
         
-        print(f"[✓] Modelo cargado: {model_path}")
+        print(f"[✓] Modelo cargado: {model_path} ({self.backend})")
         print(f"[✓] Features: {self.feature_cols}")
         
-        # Ventanas de tiempo para análisis
-        self.packet_times = deque(maxlen=1000)
-        self.attack_history = defaultdict(lambda: deque(maxlen=25))
+        # Lote de features pendientes de predecir: el modelo se invoca una vez
+        # por lote (batch_size paquetes o batch_timeout segundos) en lugar de
+        # una vez por paquete. El extractor escribe las features de un paquete
+        # en su fila con las columnas ya resueltas para este modelo. Todas las
+        # features caben en int16 (RSSI acotado a [-128, 0] dBm), igual que
+        # en el entrenamiento; el backend convierte el lote si lo necesita
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self._pending = np.zeros((batch_size, len(self.feature_cols)), dtype=np.int16)
+        self._extract = self._build_extractor(self.feature_cols)
         
-        # Contadores por MAC para detectar patrones
-        self.mac_stats = defaultdict(lambda: {
-            'deauth_count': 0,
-            'beacon_count': 0,
-            'auth_count': 0,
-            'total_packets': 0,
-            'first_seen': time.time(),
-            'last_alert': 0,
-            'last_alert_type': None,
-            'beacon_times': deque(maxlen=100)  # ⭐ NUEVO: timestamps de beacons
-        })
+        # Datos de cada paquete del lote necesarios tras la predicción
+        self._pending_mac = [None] * batch_size
+        self._pending_rssi = [0] * batch_size
+        self._pending_subtype = [0] * batch_size
+        self._pending_pr = [0] * batch_size
+        self._pending_time = [0.0] * batch_size
+        self._n_pending = 0
+        self._batch_start = 0.0
+        self._last_stats_print = time.monotonic()
+        
+        # Captura y análisis en hilos separados: el hilo de captura solo
+        # encola (momento, subtype, rssi, fc_flags, src_mac) y el de análisis
+        # agrupa en lotes, predice y analiza, sin bloquear la recepción
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._sniffer = None
+        self._capture_thread = None
+        self._capture_error = None
+        
+        # Las features siempre son finitas: evitar el escaneo de NaN de sklearn
+        sklearn.set_config(assume_finite=True)
+        
+        # Lotes pequeños: un solo hilo evita el coste de arrancar el pool de
+        # hilos (n_jobs del Random Forest y OpenMP de sklearn)
+        if hasattr(self.model, "n_jobs"):
+            self.model.n_jobs = 1
+        threadpool_limits(limits=1, user_api="openmp")
+        
+        # Ventanas de tiempo para análisis: timestamps del último segundo en
+        # orden creciente (se recortan con bisect en packet_rate)
+        self.packet_times = []
+        self.max_packet_rate = 1000
+        
+        # Historial y estadísticas por MAC acotados a max_macs en orden LRU:
+        # las MACs que dejan de transmitir acaban saliendo de memoria
+        self.max_macs = max_macs
+        self.attack_history = OrderedDict()
+        
+        # Contadores por MAC para detectar patrones: _mac_idx asigna una fila
+        # a cada MAC y cada campo de _MAC_FIELDS es un ndarray por filas
+        # (los beacon_times forman un anillo de BEACON_WINDOW por MAC)
+        self._mac_idx = OrderedDict()
+        self._mac_cap = 0
+        self._grow_mac_arrays(min(256, max_macs))
         
         # ╔═══════════════════════════════════════════════════════════════════╗
         # ║  CONFIGURACIÓN DE UMBRALES - AJUSTA AQUÍ PARA TUS NECESIDADES    ║
@@ -118,6 +438,17 @@ class CyberSenRealTimeDetector:
             }
         }
         
+        # Umbrales resueltos una sola vez: tupla (min_predictions, confidence,
+        # cooldown) indexada por Attack y tasas como atributos, en lugar de
+        # encadenar .get() sobre self.thresholds en cada paquete
+        self._alert_th = tuple(
+            (cfg.get('min_predictions', 15), cfg.get('confidence', 0.85), cfg.get('cooldown', 60))
+            for cfg in (self.thresholds.get(name, {}) for name in ATTACK_NAMES)
+        )
+        self._deauth_rate_th = self.thresholds['deauth']['rate_threshold']
+        self._beacon_rate_th = self.thresholds['beacon_flood']['rate_threshold']
+        self._min_beacons = self.thresholds['beacon_flood']['min_beacons']
+        
         # MACs inválidas que se deben ignorar (falsos positivos comunes)
         self.invalid_macs = {
             '00:00:00:00:00:00',
@@ -130,10 +461,108 @@ class CyberSenRealTimeDetector:
             'total_packets': 0,
             'alerts': 0,
             'false_positives_filtered': 0,
-            'start_time': time.time(),
-            'predictions': defaultdict(int)
+            'errors': 0,                  # paquetes descartados por fallos del modelo
+            'last_error': None,
+            'start_time': time.monotonic(),
+            'predictions': [0] * len(Attack)
         }
         
+    def _load_onnx(self, onnx_path):
+        """
+        Crea una sesión de ONNX Runtime en modo latencia (un solo hilo)
+        
+        Returns:
+            callable: Función que recibe la matriz de features y devuelve las
+                      etiquetas; los errores de onnxruntime se elevan como ValueError
+        """
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        
+        input_name = session.get_inputs()[0].name
+        label_name = session.get_outputs()[0].name
+        
+        def predict(features):
+            try:
+                return session.run([label_name], {input_name: features.astype(np.float32)})[0]
+            except ORT_ERRORS as e:
+                raise ValueError(f"onnxruntime: {e}") from e
+        
+        return predict
+    
+    def _grow_mac_arrays(self, capacity):
+        """Crea o amplía (duplicando y copiando) los arrays de estadísticas por MAC"""
+        for name, dtype, width in _MAC_FIELDS:
+            shape = (capacity,) if width is None else (capacity, width)
+            arr = np.zeros(shape, dtype=dtype)
+            if self._mac_cap:
+                arr[:self._mac_cap] = getattr(self, name)
+            setattr(self, name, arr)
+        self._mac_cap = capacity
+    
+    def _mac_slot(self, mac, now):
+        """
+        Devuelve la fila de una MAC en los arrays de estadísticas
+        Las MACs nuevas reciben la siguiente fila libre con first_seen = now;
+        con max_macs filas ocupadas se recicla la de la MAC usada hace más tiempo
+        """
+        slot = self._mac_idx.get(mac)
+        if slot is not None:
+            self._mac_idx.move_to_end(mac)
+            return slot
+        
+        if len(self._mac_idx) < self.max_macs:
+            slot = len(self._mac_idx)
+            if slot == self._mac_cap:
+                self._grow_mac_arrays(min(2 * self._mac_cap, self.max_macs))
+        else:
+            _, slot = self._mac_idx.popitem(last=False)
+            for name, _, _ in _MAC_FIELDS:
+                getattr(self, name)[slot] = 0
+        
+        self._mac_idx[mac] = slot
+        self._first_seen[slot] = now
+        return slot
+    
+    def _history(self, mac):
+        """Historial de predicciones de una MAC (LRU acotado a max_macs)"""
+        history = self.attack_history.get(mac)
+        if history is None:
+            history = self.attack_history[mac] = PredictionHistory(maxlen=25)
+            if len(self.attack_history) > self.max_macs:
+                self.attack_history.popitem(last=False)
+        else:
+            self.attack_history.move_to_end(mac)
+        return history
+    
+    def _build_extractor(self, feature_cols):
+        """
+        Genera la función que escribe las features de un paquete en una fila del lote
+        El código se compila a partir de COL_EXPR para las columnas exactas del
+        modelo: una asignación por feature, sin búsquedas ni condiciones
+        
+        Args:
+            feature_cols: Columnas con las que se entrenó el modelo
+        
+        Returns:
+            callable: extract(row, subtype, rssi, packet_rate, fc_flags)
+        """
+        # Una feature que el detector no sabe calcular quedaría fija en 0 y
+        # el modelo predeciría mal sin avisar: no se arranca con ese modelo
+        unsupported = [col for col in feature_cols if col not in COL_EXPR]
+        if unsupported:
+            raise ValueError(f"El modelo usa features que el detector no calcula: {unsupported} "
+                             f"(soportadas: {list(COL_EXPR)})")
+        
+        lines = [f"    row[{j}] = {COL_EXPR[col]}" for j, col in enumerate(feature_cols)]
+        if not lines:
+            raise ValueError("El modelo no tiene features")
+        
+        src = "def extract(row, subtype, rssi, pr, fc_flags):\n" + "\n".join(lines) + "\n"
+        namespace = {}
+        exec(compile(src, "<extractor>", "exec"), namespace)
+        return namespace["extract"]
+    
     def is_valid_mac(self, mac):
         """Verifica si una MAC es válida"""
         if mac in self.invalid_macs:
@@ -142,57 +571,65 @@ class CyberSenRealTimeDetector:
             return False
         return True
     
-    def packet_rate(self):
-        """Calcula la tasa de paquetes por segundo"""
-        now = time.time()
-        self.packet_times.append(now)
+    def packet_rate(self, now):
+        """
+        Calcula la tasa de paquetes por segundo
         
-        cutoff = now - 1.0
-        while self.packet_times and self.packet_times[0] < cutoff:
-            self.packet_times.popleft()
+        Args:
+            now: Momento de captura del paquete (time.monotonic())
+        """
+        packet_times = self.packet_times
+        packet_times.append(now)
         
-        return len(self.packet_times)
+        # Los timestamps son monótonos: un único borrado de los anteriores
+        # al corte en lugar de un popleft por timestamp
+        cutoff = bisect_left(packet_times, now - 1.0)
+        if cutoff:
+            del packet_times[:cutoff]
+        
+        return min(len(packet_times), self.max_packet_rate)
     
     def normalize_prediction(self, prediction):
         """
         Normaliza las predicciones del modelo a solo los ataques que queremos detectar
-        Convierte auth_flood y otras predicciones a normal
-        """
-        valid_attacks = ['deauth', 'beacon_flood', 'rogue_ap', 'normal']
+        Convierte auth_flood y otras predicciones a normal (train_model.py ya
+        entrena solo con etiquetas válidas; esto cubre modelos anteriores)
         
-        if prediction in valid_attacks:
-            return prediction
-        
-        return 'normal'
+        Returns:
+            Attack: Etiqueta entera de la predicción
+        """
+        return _LABEL_TO_ATTACK.get(prediction, Attack.NORMAL)
     
-    def should_alert(self, attack_type, src_mac):
+    def should_alert(self, attack_type, src_mac, now):
         """
         Determina si se debe emitir una alerta
+        
+        Args:
+            attack_type: Tipo de ataque confirmado (Attack)
+            src_mac: MAC de origen
+            now: Momento de captura del paquete (time.monotonic())
         """
         # Verificar MAC válida
         if not self.is_valid_mac(src_mac):
             self.stats['false_positives_filtered'] += 1
             return False
         
+        min_preds, min_conf, cooldown = self._alert_th[attack_type]
+        
         # Verificar cooldown
-        last_alert = self.mac_stats[src_mac]['last_alert']
-        last_type = self.mac_stats[src_mac]['last_alert_type']
-        cooldown = self.thresholds.get(attack_type, {}).get('cooldown', 60)
+        slot = self._mac_slot(src_mac, now)
         
-        if time.time() - last_alert < cooldown and last_type == attack_type:
+        if now - self._last_alert[slot] < cooldown and self._last_alert_type[slot] == attack_type:
             return False
         
         # Verificar historial de predicciones
-        recent_predictions = list(self.attack_history[src_mac])
-        
-        attack_predictions = recent_predictions.count(attack_type)
+        history = self.attack_history[src_mac]
         
-        min_preds = self.thresholds.get(attack_type, {}).get('min_predictions', 15)
+        attack_predictions = history.count(attack_type)
         
         if attack_predictions >= min_preds:
-            if len(recent_predictions) > 0:
-                confidence = attack_predictions / len(recent_predictions)
-                min_conf = self.thresholds.get(attack_type, {}).get('confidence', 0.85)
+            if len(history) > 0:
+                confidence = attack_predictions / len(history)
                 
                 if confidence >= min_conf:
                     return True
@@ -206,258 +643,384 @@ class CyberSenRealTimeDetector:
         Returns:
             float: Beacons por segundo en ventana reciente
         """
-        beacon_times = list(self.mac_stats[src_mac]['beacon_times'])
-        
-        if len(beacon_times) < 5:  # Necesitamos al menos 5 beacons
-            return 0.0
-        
-        # Calcular ventana de tiempo
-        time_window = beacon_times[-1] - beacon_times[0]
-        
-        if time_window < 0.1:  # Evitar división por cero
+        slot = self._mac_idx.get(src_mac)
+        if slot is None:
             return 0.0
         
-        # Tasa = cantidad de beacons / tiempo
-        rate = len(beacon_times) / time_window
-        
-        return rate
+        return float(_beacon_rate(self._beacon_times[slot], self._beacon_head[slot], self._beacon_count[slot]))
     
-    def analyze_packet_pattern(self, pkt, src_mac):
-        """Analiza patrones de paquetes para confirmar ataques"""
+    def analyze_packet_pattern(self, subtype, src_mac, now):
+        """
+        Analiza patrones de paquetes para confirmar ataques
+        
+        Args:
+            subtype: Subtipo 802.11 del paquete
+            src_mac: MAC de origen
+            now: Momento en que se capturó el paquete (time.monotonic())
+        """
         if not self.is_valid_mac(src_mac):
             return None
         
-        stats = self.mac_stats[src_mac]
-        subtype = pkt[Dot11].subtype
+        slot = self._mac_slot(src_mac, now)
         
-        stats['total_packets'] += 1
+        self._total[slot] += 1
         
         # Análisis de Deauth
         if subtype == 12:  # Deauth
-            stats['deauth_count'] += 1
-            time_active = time.time() - stats['first_seen']
-            if time_active > 1:
-                deauth_rate = stats['deauth_count'] / time_active
-                if deauth_rate > self.thresholds['deauth']['rate_threshold']:
-                    if stats['deauth_count'] > 20:
-                        return 'deauth'
+            if _update_deauth(self._deauth_count, self._first_seen, slot, now, self._deauth_rate_th):
+                return Attack.DEAUTH
         
         # ⭐ ANÁLISIS MEJORADO DE BEACON FLOOD
         elif subtype == 8:  # Beacon
-            stats['beacon_count'] += 1
-            
-            # Registrar timestamp del beacon
-            stats['beacon_times'].append(time.time())
-            
-            # Calcular tasa precisa de beacons
-            beacon_rate = self.analyze_beacon_rate(src_mac)
+            # Registrar timestamp del beacon y calcular tasa precisa
+            beacon_rate = _update_beacon(self._beacon_times, self._beacon_head, self._beacon_count, slot, now)
+            beacon_count = int(self._beacon_count[slot])
             
             # Verificar umbrales ajustados
-            rate_threshold = self.thresholds['beacon_flood']['rate_threshold']
-            min_beacons = self.thresholds['beacon_flood']['min_beacons']
+            rate_threshold = self._beacon_rate_th
+            min_beacons = self._min_beacons
             
             # Debug: Mostrar tasa de beacons cada 20 beacons
-            if stats['beacon_count'] % 20 == 0:
-                print(f"[DEBUG] MAC {src_mac[:17]}: {stats['beacon_count']} beacons, rate={beacon_rate:.2f}/s")
+            if beacon_count % 20 == 0:
+                print(f"[DEBUG] MAC {src_mac[:17]}: {beacon_count} beacons, rate={beacon_rate:.2f}/s")
             
             # Condiciones para confirmar beacon flood:
             # 1. Tasa > 30 beacons/segundo
             # 2. Al menos 50 beacons totales
-            if beacon_rate > rate_threshold and stats['beacon_count'] >= min_beacons:
+            if beacon_rate > rate_threshold and beacon_count >= min_beacons:
                 print(f"[!] Beacon flood detectado: {beacon_rate:.2f} beacons/s (threshold: {rate_threshold})")
-                return 'beacon_flood'
+                return Attack.BEACON_FLOOD
         
         return None
     
-    def emit_alert(self, attack_type, src_mac, details):
-        """Emite una alerta de ataque detectado con mensajes claros"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        alert_info = {
-            'deauth': {
-                'symbol': '🚨',
-                'severity': 'ALTA',
-                'title': 'ATAQUE DEAUTH',
-                'description': 'Intento de desconectar dispositivos de la red WiFi'
-            },
-            'beacon_flood': {
-                'symbol': '⚠️',
-                'severity': 'MEDIA',
-                'title': 'ATAQUE BEACON FLOOD',
-                'description': 'Inundación de redes WiFi falsas para confundir dispositivos'
-            },
-            'rogue_ap': {
-                'symbol': '🔴',
-                'severity': 'ALTA',
-                'title': 'ATAQUE ROGUE AP',
-                'description': 'Punto de acceso falso intentando suplantar red legítima'
-            }
-        }
+    def emit_alert(self, attack_type, src_mac, details, now):
+        """
+        Emite una alerta de ataque detectado con mensajes claros
+        El bloque se compone completo y se escribe con una sola llamada
+        """
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        info = ALERT_INFO.get(attack_type, DEFAULT_ALERT_INFO)
         
-        info = alert_info.get(attack_type, {
-            'symbol': '⚡',
-            'severity': 'MEDIA',
-            'title': 'ACTIVIDAD SOSPECHOSA',
-            'description': 'Comportamiento anormal detectado en la red'
-        })
-        
-        print(f"\n{info['symbol']} ═══════════════════════════════════════════════")
-        print(f"║ ¡ALERTA DE SEGURIDAD!")
-        print(f"║")
-        print(f"║ {info['title']}")
-        print(f"║ {info['description']}")
-        print(f"║")
-        print(f"║ ⏰ Hora: {timestamp}")
-        print(f"║ ⚠️  Nivel de riesgo: {info['severity']}")
-        print(f"║ 📍 Dispositivo atacante: {src_mac}")
-        print(f"║ 📶 Señal: {details.get('rssi', 'N/A')} dBm")
-        print(f"║ 📊 Tráfico: {details.get('packet_rate', 'N/A')} paquetes/segundo")
-        print(f"║ 🎯 Certeza: {details.get('confidence', 0)*100:.0f}%")
+        lines = [
+            f"\n{info['symbol']} ═══════════════════════════════════════════════",
+            f"║ ¡ALERTA DE SEGURIDAD!",
+            f"║",
+            f"║ {info['title']}",
+            f"║ {info['description']}",
+            f"║",
+            f"║ ⏰ Hora: {timestamp}",
+            f"║ ⚠️  Nivel de riesgo: {info['severity']}",
+            f"║ 📍 Dispositivo atacante: {src_mac}",
+            f"║ 📶 Señal: {details.get('rssi', 'N/A')} dBm",
+            f"║ 📊 Tráfico: {details.get('packet_rate', 'N/A')} paquetes/segundo",
+            f"║ 🎯 Certeza: {details.get('confidence', 0)*100:.0f}%",
+        ]
         
         # Info específica para beacon flood
-        if attack_type == 'beacon_flood':
+        if attack_type == Attack.BEACON_FLOOD:
             beacon_rate = details.get('beacon_rate', 0)
             beacon_count = details.get('beacon_count', 0)
-            print(f"║ 📡 Beacons detectados: {beacon_count}")
-            print(f"║ ⚡ Tasa de beacons: {beacon_rate:.2f} beacons/segundo")
-        
-        print(f"║")
-        print(f"║ 💡 Recomendación:")
-        
-        if attack_type == 'deauth':
-            print(f"║    • Verifica qué dispositivos se están desconectando")
-            print(f"║    • Busca el dispositivo con MAC: {src_mac} físicamente")
-            print(f"║    • Considera cambiar el canal WiFi del router")
-            print(f"║    • Activa protección 802.11w (PMF) en el router")
-        elif attack_type == 'beacon_flood':
-            print(f"║    • Ignora las nuevas redes WiFi que aparecen")
-            print(f"║    • No conectes a redes desconocidas")
-            print(f"║    • Mantén tu SSID oculto si es posible")
-            print(f"║    • Verifica con airodump-ng: sudo airodump-ng {self.interface}")
-        elif attack_type == 'rogue_ap':
-            print(f"║    • NO te conectes a esa red WiFi")
-            print(f"║    • Verifica el BSSID legítimo de tu red")
-            print(f"║    • Alerta a otros usuarios de la red")
-        
-        print(f"═══════════════════════════════════════════════\n")
+            lines.append(f"║ 📡 Beacons detectados: {beacon_count}")
+            lines.append(f"║ ⚡ Tasa de beacons: {beacon_rate:.2f} beacons/segundo")
+        
+        lines.append(f"║")
+        lines.append(f"║ 💡 Recomendación:")
+        
+        if attack_type == Attack.DEAUTH:
+            lines += [
+                f"║    • Verifica qué dispositivos se están desconectando",
+                f"║    • Busca el dispositivo con MAC: {src_mac} físicamente",
+                f"║    • Considera cambiar el canal WiFi del router",
+                f"║    • Activa protección 802.11w (PMF) en el router",
+            ]
+        elif attack_type == Attack.BEACON_FLOOD:
+            lines += [
+                f"║    • Ignora las nuevas redes WiFi que aparecen",
+                f"║    • No conectes a redes desconocidas",
+                f"║    • Mantén tu SSID oculto si es posible",
+                f"║    • Verifica con airodump-ng: sudo airodump-ng {self.interface}",
+            ]
+        elif attack_type == Attack.ROGUE_AP:
+            lines += [
+                f"║    • NO te conectes a esa red WiFi",
+                f"║    • Verifica el BSSID legítimo de tu red",
+                f"║    • Alerta a otros usuarios de la red",
+            ]
+        
+        lines.append(f"═══════════════════════════════════════════════\n\n")
+        
+        sys.stdout.write("\n".join(lines))
+        sys.stdout.flush()
         
         self.stats['alerts'] += 1
-        self.mac_stats[src_mac]['last_alert'] = time.time()
-        self.mac_stats[src_mac]['last_alert_type'] = attack_type
+        slot = self._mac_slot(src_mac, now)
+        self._last_alert[slot] = now
+        self._last_alert_type[slot] = attack_type
     
-    def predict_attack(self, pkt):
-        """Predice si un paquete es parte de un ataque"""
-        if not pkt.haslayer(Dot11):
+    def _enqueue(self, pkt):
+        """Callback de AsyncSniffer: extrae los campos del paquete Scapy y los pasa al hilo de análisis"""
+        # Una sola búsqueda de la capa 802.11 reutilizada para todos los campos
+        dot11 = pkt.getlayer(Dot11)
+        if dot11 is None:
             return
         
+        rssi = getattr(pkt, "dBm_AntSignal", None)
+        if rssi is None:
+            rssi = -70
+        self._queue.put((time.monotonic(), dot11.subtype, rssi, int(dot11.FCfield), dot11.addr2))
+    
+    def _enqueue_fields(self, now, subtype, rssi, fc_flags, src_mac):
+        """
+        Añade las features de un paquete al lote pendiente
+        El lote se predice al llenarse o al superar batch_timeout
+        
+        Args:
+            now: Momento de captura (time.monotonic())
+            subtype: Subtipo 802.11
+            rssi: Señal en dBm
+            fc_flags: Flags del Frame Control (retry, power management...)
+            src_mac: MAC de origen (addr2) o None
+        """
         self.stats['total_packets'] += 1
         
+        pr = self.packet_rate(now)
+        rssi = max(-128, min(0, int(rssi)))
+        
+        if src_mac is None:
+            src_mac = "00:00:00:00:00:00"
+        
+        # FILTRO 1: Ignorar MACs inválidas inmediatamente
+        if not self.is_valid_mac(src_mac):
+            self.stats['false_positives_filtered'] += 1
+            return
+        
+        # Construir features en la siguiente fila libre del lote
+        i = self._n_pending
+        self._extract(self._pending[i], subtype, rssi, pr, fc_flags)
+        
+        self._pending_mac[i] = src_mac
+        self._pending_rssi[i] = rssi
+        self._pending_subtype[i] = subtype
+        self._pending_pr[i] = pr
+        self._pending_time[i] = now
+        
+        if i == 0:
+            self._batch_start = now
+        self._n_pending = i + 1
+        
+        if self._n_pending == self.batch_size or now - self._batch_start >= self.batch_timeout:
+            self._flush()
+    
+    def _sniff_raw(self):
+        """
+        Captura con un socket AF_PACKET crudo sobre la interfaz en modo monitor
+        Las tramas se leen en un buffer reutilizado y se parsean directamente
+        (RadioTap + cabecera 802.11) sin crear objetos Scapy
+        """
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
         try:
-            subtype = pkt[Dot11].subtype
-            rssi = pkt.dBm_AntSignal if hasattr(pkt, "dBm_AntSignal") else -70
-            pr = self.packet_rate()
-            freq = 2412
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CAPTURE_BUFSIZE)
+            sock.bind((self.interface, 0))
             
-            src_mac = pkt.addr2 if pkt.addr2 else "00:00:00:00:00:00"
+            if self.bpf_filter:
+                try:
+                    from scapy.arch.linux import attach_filter
+                    attach_filter(sock, self.bpf_filter, self.interface)
+                except Exception as e:
+                    print(f"[⚠️] No se pudo aplicar el filtro BPF: {e}")
             
-            # FILTRO 1: Ignorar MACs inválidas inmediatamente
-            if not self.is_valid_mac(src_mac):
-                self.stats['false_positives_filtered'] += 1
-                return
-            
-            # Construir features
-            features_dict = {
-                "frame_type": subtype,
-                "rssi": rssi,
-                "packet_rate": pr,
-                "freq": freq
-            }
+            # Con timeout, el bucle comprueba periódicamente si debe detenerse
+            sock.settimeout(self.batch_timeout)
             
-            if "retry" in self.feature_cols:
-                features_dict["retry"] = 1 if pkt[Dot11].FCfield & 0x08 else 0
-            if "power_mgmt" in self.feature_cols:
-                features_dict["power_mgmt"] = 1 if pkt[Dot11].FCfield & 0x10 else 0
+            buf = bytearray(65536)
+            view = memoryview(buf)
+            put = self._queue.put
             
-            features = pd.DataFrame([features_dict], columns=self.feature_cols)
+            while not self._stop.is_set():
+                try:
+                    n = sock.recv_into(buf)
+                except socket.timeout:
+                    continue
+                
+                fields = parse_radiotap_frame(view[:n])
+                if fields is None:
+                    continue
+                
+                put((time.monotonic(), *fields))
+        finally:
+            sock.close()
+    
+    def _capture_raw(self):
+        """Hilo de captura cruda: guarda el error (p. ej. permisos) para el hilo principal"""
+        try:
+            self._sniff_raw()
+        except Exception as e:
+            self._capture_error = e
+    
+    def _start_capture(self):
+        """Arranca el hilo de captura del backend elegido"""
+        self._stop.clear()
+        self._capture_error = None
+        
+        if self.capture == "raw":
+            # El parseo directo asume RadioTap + 802.11: con otra interfaz
+            # (p. ej. Ethernet o sin modo monitor) solo leería basura
+            link_type = interface_link_type(self.interface)
+            if link_type != ARPHRD_IEEE80211_RADIOTAP:
+                raise ValueError(f"{self.interface} no es una interfaz en modo monitor con RadioTap "
+                                 f"(tipo de enlace {link_type}, se esperaba {ARPHRD_IEEE80211_RADIOTAP}); "
+                                 f"usa --capture scapy o activa el modo monitor")
+            self._capture_thread = threading.Thread(target=self._capture_raw, daemon=True)
+            self._capture_thread.start()
+        else:
+            self._sniffer = AsyncSniffer(
+                iface=self.interface,
+                prn=self._enqueue,
+                store=False,
+                monitor=True,
+                filter=self.bpf_filter
+            )
+            self._sniffer.start()
+            self._capture_thread = self._sniffer.thread
+    
+    def _stop_capture(self):
+        """Detiene el hilo de captura y recoge su error si lo hubo"""
+        self._stop.set()
+        
+        if self._sniffer is not None:
+            if self._sniffer.running:
+                self._sniffer.stop()
+            self._capture_error = self._capture_error or getattr(self._sniffer, 'exception', None)
+            self._sniffer = None
+        
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=1.0)
+    
+    def _process_queue(self):
+        """
+        Bucle de análisis: consume la cola de captura y alimenta el lote
+        Si no llegan paquetes en batch_timeout se predice el lote pendiente
+        Termina cuando el hilo de captura se detiene
+        """
+        get = self._queue.get
+        
+        while True:
+            try:
+                item = get(timeout=self.batch_timeout)
+            except queue.Empty:
+                self._flush()
+                if not self._capture_thread.is_alive():
+                    return
+                continue
             
-            # Predicción
-            raw_prediction = self.model.predict(features)[0]
+            self._enqueue_fields(*item)
+    
+    def _drain_queue(self):
+        """Procesa los paquetes que quedaron en la cola sin esperar"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._enqueue_fields(*item)
+    
+    def _flush(self):
+        """Predice el lote pendiente con una sola llamada al modelo y analiza cada paquete"""
+        n = self._n_pending
+        if n == 0:
+            return
+        self._n_pending = 0
+        
+        # Predicción: si el modelo rechaza el lote se descarta y se cuenta
+        try:
+            raw_predictions = self.predict_batch(self._pending[:n])
+        except ValueError as e:
+            self.stats['errors'] += n
+            self.stats['last_error'] = str(e)
+            raw_predictions = ()
+        
+        for i in range(len(raw_predictions)):
+            src_mac = self._pending_mac[i]
+            now = self._pending_time[i]
             
             # IMPORTANTE: Normalizar predicción
-            prediction = self.normalize_prediction(raw_prediction)
+            prediction = self.normalize_prediction(raw_predictions[i])
             
             self.stats['predictions'][prediction] += 1
             
             # Registrar en historial
-            self.attack_history[src_mac].append(prediction)
+            history = self._history(src_mac)
+            history.append(prediction)
             
             # Si no es normal, analizar
-            if prediction != "normal":
-                confirmed_attack = self.analyze_packet_pattern(pkt, src_mac)
+            if prediction != Attack.NORMAL:
+                confirmed_attack = self.analyze_packet_pattern(self._pending_subtype[i], src_mac, now)
                 
-                if confirmed_attack and self.should_alert(confirmed_attack, src_mac):
-                    recent = list(self.attack_history[src_mac])
-                    confidence = recent.count(confirmed_attack) / len(recent) if recent else 0
+                if confirmed_attack and self.should_alert(confirmed_attack, src_mac, now):
+                    confidence = history.count(confirmed_attack) / len(history) if len(history) else 0
                     
                     details = {
-                        'rssi': rssi,
-                        'packet_rate': pr,
+                        'rssi': self._pending_rssi[i],
+                        'packet_rate': self._pending_pr[i],
                         'confidence': confidence,
-                        'subtype': subtype
+                        'subtype': self._pending_subtype[i]
                     }
                     
                     # Agregar info específica para beacon flood
-                    if confirmed_attack == 'beacon_flood':
+                    if confirmed_attack == Attack.BEACON_FLOOD:
                         details['beacon_rate'] = self.analyze_beacon_rate(src_mac)
-                        details['beacon_count'] = self.mac_stats[src_mac]['beacon_count']
+                        details['beacon_count'] = int(self._beacon_count[self._mac_idx[src_mac]])
                     
-                    self.emit_alert(confirmed_attack, src_mac, details)
-            
-            # Mostrar estadísticas cada 100 paquetes
-            if self.stats['total_packets'] % 100 == 0:
-                self.print_stats()
-                
-        except Exception as e:
-            pass
+                    self.emit_alert(confirmed_attack, src_mac, details, now)
+        
+        # Mostrar estadísticas cada STATS_INTERVAL segundos
+        now = time.monotonic()
+        if now - self._last_stats_print >= STATS_INTERVAL:
+            self._last_stats_print = now
+            self.print_stats()
     
     def print_stats(self):
-        """Imprime estadísticas del sistema en lenguaje simple"""
-        uptime = time.time() - self.stats['start_time']
+        """
+        Imprime estadísticas del sistema en lenguaje simple
+        El resumen se compone en memoria y se escribe con una sola llamada
+        """
+        uptime = time.monotonic() - self.stats['start_time']
         pps = self.stats['total_packets'] / uptime if uptime > 0 else 0
         
-        print(f"\n{'─'*60}")
-        print(f"📊 RESUMEN DE ACTIVIDAD")
-        print(f"{'─'*60}")
-        print(f"✓ Paquetes analizados: {self.stats['total_packets']}")
-        print(f"🚨 Alertas de seguridad: {self.stats['alerts']}")
-        print(f"🛡️  Falsos positivos filtrados: {self.stats['false_positives_filtered']}")
-        print(f"⚡ Velocidad: {pps:.1f} paquetes/seg")
-        print(f"⏱️  Tiempo activo: {int(uptime)}s")
-        
-        if self.stats['predictions']:
-            print(f"\n📈 CLASIFICACIÓN DEL TRÁFICO:")
+        out = io.StringIO()
+        out.write(f"\n{'─'*60}\n"
+                  f"📊 RESUMEN DE ACTIVIDAD\n"
+                  f"{'─'*60}\n"
+                  f"✓ Paquetes analizados: {self.stats['total_packets']}\n"
+                  f"🚨 Alertas de seguridad: {self.stats['alerts']}\n"
+                  f"🛡️  Falsos positivos filtrados: {self.stats['false_positives_filtered']}\n"
+                  f"⚡ Velocidad: {pps:.1f} paquetes/seg\n"
+                  f"⏱️  Tiempo activo: {int(uptime)}s\n")
+        if self.stats['errors']:
+            out.write(f"❗ Paquetes descartados por errores: {self.stats['errors']}\n"
+                      f"   Último error: {self.stats['last_error']}\n")
+        
+        predictions = self.stats['predictions']
+        if any(predictions):
+            out.write(f"\n📈 CLASIFICACIÓN DEL TRÁFICO:\n")
             total = self.stats['total_packets']
             
+            # Normal primero y después los ataques de mayor a menor
             sorted_preds = sorted(
-                self.stats['predictions'].items(),
-                key=lambda x: (x[0] != 'normal', -x[1])
+                (pred_type for pred_type in Attack if predictions[pred_type]),
+                key=lambda pred_type: (pred_type != Attack.NORMAL, -predictions[pred_type])
             )
             
-            for pred_type, count in sorted_preds:
+            for pred_type in sorted_preds:
+                count = predictions[pred_type]
                 pct = (count / total) * 100
-                bar_length = int(pct / 5)
-                bar = '█' * bar_length
-                
-                emoji = {
-                    'normal': '✅',
-                    'deauth': '🚨',
-                    'beacon_flood': '⚠️',
-                    'rogue_ap': '🔴'
-                }.get(pred_type, '📊')
-                
-                print(f"  {emoji} {pred_type:15s} | {bar} {count:4d} ({pct:5.1f}%)")
+                bar = '█' * int(pct / 5)
+                out.write(f"  {ATTACK_EMOJI[pred_type]} {ATTACK_NAMES[pred_type]:15s} | {bar} {count:4d} ({pct:5.1f}%)\n")
         
-        print(f"{'─'*60}\n")
+        out.write(f"{'─'*60}\n\n")
+        
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
     
     def start_detection(self):
         """Inicia la detección en tiempo real con manejo robusto de errores"""
@@ -472,12 +1035,17 @@ class CyberSenRealTimeDetector:
         print(f"{'='*60}\n")
         
         try:
-            sniff(
-                iface=self.interface,
-                prn=self.predict_attack,
-                store=False,
-                monitor=True
-            )
+            self._start_capture()
+            try:
+                self._process_queue()
+            finally:
+                self._stop_capture()
+                # Procesar los paquetes que quedaron en la cola y en el lote
+                self._drain_queue()
+                self._flush()
+            
+            if self._capture_error is not None:
+                raise self._capture_error
         except KeyboardInterrupt:
             print(f"\n\n{'='*60}")
             print(f"⏸️  DETECCIÓN DETENIDA POR USUARIO")
@@ -497,13 +1065,20 @@ def main():
     parser = argparse.ArgumentParser(description="CyberSen Detector - Monitoreo WiFi en Tiempo Real")
     parser.add_argument("--interface", "-i", default="wlan0", help="Interfaz de red")
     parser.add_argument("--model", "-m", default="model/model.pkl", help="Modelo entrenado")
+    parser.add_argument("--batch-size", "-b", type=int, default=64, help="Paquetes por lote de predicción")
+    parser.add_argument("--bpf", default=DEFAULT_BPF, help="Filtro BPF de captura (\"\" para desactivarlo)")
+    parser.add_argument("--capture", choices=["scapy", "raw"], default="scapy",
+                        help="Backend de captura: scapy (sniff) o raw (socket AF_PACKET, más rápido)")
     
     args = parser.parse_args()
     
     try:
         detector = CyberSenRealTimeDetector(
             model_path=args.model,
-            interface=args.interface
+            interface=args.interface,
+            batch_size=args.batch_size,
+            bpf_filter=args.bpf,
+            capture=args.capture
         )
         detector.start_detection()
     except FileNotFoundError as e:
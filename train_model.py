@@ -6,7 +6,7 @@ Optimizado con validación cruzada y métricas detalladas
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from sklearn.preprocessing import LabelEncoder
 import joblib
@@ -14,14 +14,120 @@ import os
 import warnings
 warnings.filterwarnings('ignore')
 
-def train_model(dataset_file="data/final_dataset.csv", model_output="model/model.pkl"):
+# Etiquetas que el detector en tiempo real sabe manejar; el resto
+# (p. ej. auth_flood) se entrena como normal
+VALID_LABELS = frozenset({'normal', 'deauth', 'beacon_flood', 'rogue_ap'})
+
+def resolve_dataset_path(dataset_file=None):
+    """
+    Devuelve la ruta del dataset final
+    Sin ruta explícita se usa el más reciente entre data/final_dataset.parquet
+    y data/final_dataset.csv (build_dataset.py guarda CSV sin pyarrow o con
+    --format csv), para no entrenar con un dataset anterior
+    """
+    if dataset_file:
+        return dataset_file
+    
+    candidates = [c for c in ("data/final_dataset.parquet", "data/final_dataset.csv") if os.path.exists(c)]
+    if not candidates:
+        return "data/final_dataset.parquet"
+    
+    newest = max(candidates, key=os.path.getmtime)
+    if len(candidates) > 1:
+        print(f"[⚠️] Existen {' y '.join(candidates)}: se usa el más reciente ({newest})")
+    return newest
+
+def load_dataset(dataset_file):
+    """Lee el dataset en Parquet o CSV según la extensión"""
+    if dataset_file.endswith(".parquet"):
+        return pd.read_parquet(dataset_file)
+    return pd.read_csv(dataset_file)
+
+def quantize_features(X):
+    """
+    Convierte las features a int16, el mismo tipo del buffer del detector
+    El RSSI se limita a [-128, 0] dBm y el resto al rango de int16
+    
+    Args:
+        X: DataFrame con las columnas de features
+    
+    Returns:
+        DataFrame: Features en int16
+    """
+    info = np.iinfo(np.int16)
+    X = X.clip(lower=info.min, upper=info.max)
+    X["rssi"] = X["rssi"].clip(-128, 0)
+    return X.astype(np.int16)
+
+def export_onnx(model, X_sample, onnx_output):
+    """
+    Exporta el modelo a ONNX para inferencia compilada en el detector
+    (onnxruntime evalúa los árboles en C++ en lugar del recorrido de sklearn)
+    La entrada ONNX es float32: el detector convierte su lote int16 al llamar
+    
+    El modelo exportado solo se conserva si sus predicciones coinciden con
+    model.predict sobre X_sample. Si la exportación falla se avisa de forma
+    explícita: el detector usará scikit-learn
+    
+    Args:
+        model: Clasificador entrenado
+        X_sample: Features de muestra (p. ej. el set de prueba) para la verificación
+        onnx_output: Ruta del archivo .onnx
+    
+    Returns:
+        bool: True si se exportó y verificó el modelo
+    """
+    try:
+        from skl2onnx import to_onnx
+    except ImportError:
+        print(f"[*] skl2onnx no instalado: se omite la exportación a ONNX")
+        print(f"    (opcional) pip install skl2onnx onnxruntime")
+        return False
+    
+    X_sample = np.asarray(X_sample, dtype=np.float32)
+    
+    try:
+        onx = to_onnx(model, X_sample[:1], options={id(model): {'zipmap': False}})
+    except Exception as e:
+        # Solo la primera línea: skl2onnx incluye el volcado completo del grafo
+        reason = str(e).strip().splitlines()[0] if str(e).strip() else ""
+        print(f"\n[!] ERROR: No se pudo exportar {type(model).__name__} a ONNX: {type(e).__name__}: {reason}")
+        print(f"[!] El detector usará la inferencia de scikit-learn (más lenta)")
+        print(f"[!] Prueba con otra versión de skl2onnx compatible con tu scikit-learn")
+        return False
+    
+    with open(onnx_output, "wb") as f:
+        f.write(onx.SerializeToString())
+    
+    # Verificar que el modelo ONNX predice lo mismo que scikit-learn
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        print(f"[*] onnxruntime no instalado: no se verificó el modelo ONNX")
+    else:
+        session = ort.InferenceSession(onnx_output, providers=["CPUExecutionProvider"])
+        onnx_pred = session.run([session.get_outputs()[0].name],
+                                {session.get_inputs()[0].name: X_sample})[0]
+        mismatches = int(np.sum(onnx_pred != model.predict(X_sample)))
+        if mismatches:
+            os.remove(onnx_output)
+            print(f"\n[!] ERROR: El modelo ONNX difiere de scikit-learn en {mismatches}/{len(X_sample)} predicciones")
+            print(f"[!] Se descarta {onnx_output}: el detector usará scikit-learn")
+            return False
+        print(f"[✓] Modelo ONNX verificado: {len(X_sample)} predicciones idénticas a scikit-learn")
+    
+    print(f"[✓] Modelo ONNX guardado en: {onnx_output}")
+    return True
+
+def train_model(dataset_file=None, model_output="model/model.pkl"):
     """
     Entrena un modelo Random Forest para detectar ataques WiFi
     
     Args:
-        dataset_file: Archivo CSV con el dataset
+        dataset_file: Archivo Parquet/CSV con el dataset (por defecto data/final_dataset.*)
         model_output: Ruta donde guardar el modelo
     """
+    dataset_file = resolve_dataset_path(dataset_file)
     print(f"[*] Cargando dataset: {dataset_file}")
     
     if not os.path.exists(dataset_file):
@@ -30,7 +136,7 @@ def train_model(dataset_file="data/final_dataset.csv", model_output="model/model
         return False
     
     try:
-        df = pd.read_csv(dataset_file)
+        df = load_dataset(dataset_file)
     except Exception as e:
         print(f"[!] Error leyendo dataset: {e}")
         return False
@@ -53,8 +159,34 @@ def train_model(dataset_file="data/final_dataset.csv", model_output="model/model
         if feat in df.columns:
             feature_cols.append(feat)
     
-    X = df[feature_cols]
-    y = df["label"]
+    # Datasets que combinan CSVs antiguos (sin retry/power_mgmt) con nuevos
+    # dejan NaN en las features opcionales: se toman como 0 (flag ausente)
+    present_optional = [feat for feat in optional_features if feat in feature_cols]
+    features = df[feature_cols].fillna({feat: 0 for feat in present_optional})
+    
+    # Registros sin alguna feature obligatoria no se pueden usar
+    incomplete = features.isna().any(axis=1)
+    if incomplete.any():
+        print(f"[⚠️] Se descartan {incomplete.sum()} registros con features vacías")
+        df = df[~incomplete]
+        features = features[~incomplete]
+    
+    try:
+        X = quantize_features(features)
+    except (ValueError, TypeError) as e:
+        print(f"[!] Error: Features no numéricas en el dataset: {e}")
+        return False
+    
+    # Como texto: los Parquet se leen con label categórica, que no admite
+    # asignar 'normal' si no está entre sus categorías
+    y = df["label"].astype(str)
+    
+    # El modelo solo aprende (y predice) etiquetas válidas para el detector
+    unknown = ~y.isin(VALID_LABELS)
+    if unknown.any():
+        print(f"[*] {unknown.sum()} registros con etiquetas no soportadas se tratan como normal: "
+              f"{sorted(y[unknown].unique())}")
+        y = y.where(~unknown, 'normal')
     
     print(f"\n[*] Features utilizadas: {feature_cols}")
     print(f"[*] Distribución de clases:")
@@ -88,16 +220,19 @@ def train_model(dataset_file="data/final_dataset.csv", model_output="model/model
     print(f"[*] Set de prueba: {len(X_test)} muestras")
     
     # Entrenar modelo con parámetros optimizados
+    # Bosque reducido (64 árboles, profundidad 10): con 4-6 features la
+    # precisión apenas cambia y el modelo es más pequeño y rápido de evaluar
+    # en el detector en tiempo real (se exporta a ONNX sin problemas)
     print(f"\n[*] Entrenando Random Forest...")
     
     model = RandomForestClassifier(
-        n_estimators=150,           # Más árboles para mejor generalización
-        max_depth=15,                # Limitar profundidad para evitar overfitting
+        n_estimators=64,             # Árboles suficientes para generalizar
+        max_depth=10,                # Limitar profundidad para evitar overfitting
         min_samples_split=5,         # Mínimo de muestras para dividir
         min_samples_leaf=2,          # Mínimo de muestras en hojas
         class_weight='balanced',     # Balancear clases automáticamente
         random_state=42,
-        n_jobs=-1                    # Usar todos los cores
+        n_jobs=-1                    # Usar todos los cores (el detector usa 1)
     )
     
     model.fit(X_train, y_train)
@@ -107,7 +242,10 @@ def train_model(dataset_file="data/final_dataset.csv", model_output="model/model
     # Validación cruzada (solo si hay suficientes datos)
     if len(df) >= 100 and len(unique_labels) > 1:
         print(f"\n[*] Validación cruzada (5-fold)...")
-        cv_scores = cross_val_score(model, X, y, cv=5)
+        # Folds mezclados: el dataset puede venir en orden de archivo y tiempo
+        # (build_dataset.py solo mezcla con --shuffle o al balancear)
+        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+        cv_scores = cross_val_score(model, X, y, cv=cv)
         print(f"[*] Accuracy promedio: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
     
     # Evaluación en test set
@@ -153,13 +291,16 @@ def train_model(dataset_file="data/final_dataset.csv", model_output="model/model
     print(f"\n[✓] Modelo guardado en: {model_output}")
     print(f"[✓] Features guardadas en: {model_output.replace('.pkl', '_features.pkl')}")
     
+    # Exportar a ONNX (opcional) para la inferencia en tiempo real
+    export_onnx(model, X_test, model_output.replace('.pkl', '.onnx'))
+    
     return True
 
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="CyberSen Model Training")
-    parser.add_argument("--dataset", "-d", default="data/final_dataset.csv", help="Dataset CSV")
+    parser.add_argument("--dataset", "-d", default=None, help="Dataset Parquet/CSV (por defecto: data/final_dataset.*)")
     parser.add_argument("--output", "-o", default="model/model.pkl", help="Modelo de salida")
     
     args = parser.parse_args()